@@ -0,0 +1,105 @@
+#------------------------------------------------------------
+# Nutrition adherence for every client, computed set-wise.
+#
+# One statement returns a row per client with:
+#
+# - last_log_date: MAX(Meal_Date) grouped by user, a loose
+#   scan of the Meals (User_ID, Meal_Date, ...) index
+# - days_logged, longest_gap and the latest logging streak
+#   over the last LOOKBACK_DAYS, from DailyUserSummary with
+#   LAG() for gaps and the usual gaps-and-islands trick
+#   (date minus ROW_NUMBER() is constant along a run of
+#   consecutive days) for streaks
+#
+# longest_gap also counts the open gap from the last log up
+# to today, the one the alerts are about.
+#
+# The result for the whole fleet is cached for CACHE_TTL
+# seconds and shared by every coach's alert list, so a page
+# load is a cache lookup plus a filter to the coach's roster.
+#------------------------------------------------------------
+from datetime import date, timedelta
+
+from backend.cache import TTLCache
+from backend.db_connection import db as db_connection
+
+LOOKBACK_DAYS = 90
+# a client with no meals logged for this many days gets an alert
+ALERT_AFTER_DAYS = 3
+CACHE_TTL = 300
+
+cache = TTLCache(max_entries=4, ttl=CACHE_TTL)
+
+_ADHERENCE = """
+    WITH logged AS (
+        SELECT user_id, summary_date,
+               DATEDIFF(summary_date, LAG(summary_date) OVER w) - 1 AS gap_before,
+               DATE_SUB(summary_date, INTERVAL ROW_NUMBER() OVER w DAY) AS island
+        FROM DailyUserSummary
+        WHERE meal_count > 0 AND summary_date BETWEEN %s AND %s
+        WINDOW w AS (PARTITION BY user_id ORDER BY summary_date)
+    ),
+    runs AS (
+        SELECT user_id, gap_before, island, MAX(island) OVER (PARTITION BY user_id) AS last_island
+        FROM logged
+    ),
+    streaks AS (
+        SELECT user_id, COUNT(*) AS days_logged,
+               COALESCE(MAX(gap_before), 0) AS longest_gap,
+               SUM(island = last_island) AS last_streak
+        FROM runs
+        GROUP BY user_id
+    ),
+    last_meal AS (
+        SELECT User_ID, MAX(Meal_Date) AS last_log_date
+        FROM Meals
+        GROUP BY User_ID
+    )
+    SELECT c.client_id, c.user_id, u.fname, u.lname, lm.last_log_date,
+           COALESCE(s.days_logged, 0) AS days_logged,
+           COALESCE(s.longest_gap, 0) AS longest_gap,
+           COALESCE(s.last_streak, 0) AS last_streak
+    FROM Clients c
+    JOIN Users u ON u.user_id = c.user_id
+    LEFT JOIN last_meal lm ON lm.User_ID = c.user_id
+    LEFT JOIN streaks s ON s.user_id = c.user_id
+"""
+
+
+def sort_key(last_log_date, client_id):
+    """Most urgent first: never logged, then the oldest last log; ties by client."""
+    return (last_log_date is not None, last_log_date or "", client_id)
+
+
+def _compute(today):
+    rows = db_connection.execute_query(
+        _ADHERENCE, (today - timedelta(days=LOOKBACK_DAYS - 1), today)
+    )
+    for row in rows:
+        last = row["last_log_date"]
+        row["days_since_last_log"] = (today - last).days if last is not None else None
+        # the latest run of logged days only counts while it is unbroken
+        if last is None or row["days_since_last_log"] > 1:
+            row["current_streak"] = 0
+        else:
+            row["current_streak"] = int(row["last_streak"])
+        row["days_logged"] = int(row["days_logged"])
+        # gap_before only sees gaps between logged days; the days since the
+        # last log (today included, as nothing is logged yet) are one too
+        row["longest_gap"] = max(int(row["longest_gap"]), row["days_since_last_log"] or 0)
+        del row["last_streak"]
+        row["alert"] = (
+            "no_logs" if last is None
+            else "gap" if row["days_since_last_log"] >= ALERT_AFTER_DAYS
+            else None
+        )
+    rows.sort(key=lambda row: sort_key(
+        str(row["last_log_date"]) if row["last_log_date"] is not None else None, row["client_id"]
+    ))
+    return rows
+
+
+def all_clients(today=None):
+    """Adherence rows for every client, most urgent first, cached per day."""
+    today = today or date.today()
+    return cache.get_or_set(today, lambda: _compute(today))
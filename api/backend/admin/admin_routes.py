@@ -1,20 +1,21 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db as db_connection
-
-def get_db():
-    return db_connection.get_db().cursor()
+from backend.pagination import Keyset, paginated_rows
+from backend import adherence, missed_workouts, rollups
+from backend.nutrition import catalog
+from backend.response_cache import responses
+from backend.streaming import stream_rows
 
 admin = Blueprint("admin", __name__)
 
+AUDIT_ORDER = Keyset(("change_date", True), ("log_id", True))
+
 
 @admin.route("/users", methods=["GET"])
 def get_users():
-    db = get_db()
-    db.execute("SELECT u.*, r.Role_Name FROM Users u LEFT JOIN User_Roles r ON u.User_ID = r.User_ID")
-    users = db.fetchall()
-    db.close()
+    users = db_connection.stream_query("SELECT u.*, r.Role_Name FROM Users u LEFT JOIN User_Roles r ON u.User_ID = r.User_ID")
     
-    return jsonify(users), 200
+    return stream_rows(users)
 
 
 @admin.route("/users", methods=["PUT"])
@@ -30,18 +31,15 @@ def update_user_role():
         error = "role_id is required"
     
     if error is None:
-        db = get_db()
-        db.execute(
+        updated = db_connection.update_query(
             "UPDATE User_Roles SET Role_ID = %s WHERE User_ID = %s",
             (data["role_id"], data["user_id"])
         )
-        if db.rowcount == 0:
-            db.execute(
+        if updated == 0:
+            db_connection.insert_query(
                 "INSERT INTO User_Roles (User_ID, Role_ID) VALUES (%s, %s)",
                 (data["user_id"], data["role_id"])
             )
-        db_connection.get_db().commit()
-        db.close()
         return jsonify({"message": "User role updated successfully"}), 200
     
     return jsonify({"error": error}), 400
@@ -58,10 +56,7 @@ def delete_user():
         error = "user_id is required"
     
     if error is None:
-        db = get_db()
-        db.execute("UPDATE Users SET Is_Active = 0 WHERE User_ID = %s", (data["user_id"],))
-        db_connection.get_db().commit()
-        db.close()
+        db_connection.update_query("UPDATE Users SET Is_Active = 0 WHERE User_ID = %s", (data["user_id"],))
         return jsonify({"message": "User deactivated successfully"}), 200
     
     return jsonify({"error": error}), 400
@@ -69,60 +64,81 @@ def delete_user():
 
 @admin.route("/audit", methods=["GET"])
 def get_audit_log():
-    user_id = request.args.get("user_id")
+    admin_id = request.args.get("admin_id")
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
     
-    query = "SELECT * FROM Audit_Log WHERE 1=1"
+    query = "SELECT * FROM AuditLog WHERE 1=1"
     params = []
     
-    if user_id:
-        query += " AND User_ID = %s"
-        params.append(user_id)
+    if admin_id:
+        query += " AND admin_id = %s"
+        params.append(admin_id)
     if start_date:
-        query += " AND Change_Date >= %s"
+        query += " AND change_date >= %s"
         params.append(start_date)
     if end_date:
-        query += " AND Change_Date <= %s"
+        query += " AND change_date <= %s"
         params.append(end_date)
     
-    query += " ORDER BY Change_Date DESC"
-    
-    db = get_db()
-    db.execute(query, tuple(params))
-    audit_log = db.fetchall()
-    db.close()
-    
-    return jsonify(audit_log), 200
+    return paginated_rows(AUDIT_ORDER, query, params)
 
 
 @admin.route("/alerts", methods=["GET"])
 def get_alerts():
-    db = get_db()
-    db.execute("SELECT * FROM System_Alerts WHERE Alert_Type = 'error' ORDER BY Alert_Date DESC")
-    alerts = db.fetchall()
-    db.close()
+    alerts = db_connection.stream_query("SELECT * FROM System_Alerts WHERE Alert_Type = 'error' ORDER BY Alert_Date DESC")
     
-    return jsonify(alerts), 200
+    return stream_rows(alerts)
 
 
 @admin.route("/backups", methods=["POST"])
 def trigger_backup():
-    db = get_db()
-    db.execute("INSERT INTO Backup_Log (Backup_Date, Status) VALUES (NOW(), 'initiated')")
-    db_connection.get_db().commit()
-    backup_id = db.lastrowid
-    db.close()
+    backup_id = db_connection.insert_query("INSERT INTO Backup_Log (Backup_Date, Status) VALUES (NOW(), 'initiated')")
     
     return jsonify({"message": "Backup initiated successfully", "backup_id": backup_id}), 201
 
 
 @admin.route("/system/metrics", methods=["GET"])
 def get_system_metrics():
-    db = get_db()
-    db.execute("SELECT * FROM System_Metrics ORDER BY Metric_Date DESC LIMIT 100")
-    metrics = db.fetchall()
-    db.close()
+    metrics = db_connection.stream_query("SELECT * FROM System_Metrics ORDER BY Metric_Date DESC LIMIT 100")
     
-    return jsonify(metrics), 200
+    return stream_rows(metrics)
+
+
+@admin.route("/db/pool", methods=["GET"])
+def get_db_pool_stats():
+    return jsonify(db_connection.pool_stats()), 200
+
+
+@admin.route("/db/statements", methods=["GET"])
+def get_db_statement_stats():
+    return jsonify(db_connection.statement_stats()), 200
+
+
+@admin.route("/cache", methods=["GET"])
+def get_cache_stats():
+    return jsonify({
+        "responses": responses.stats(),
+        "foods_catalog": catalog.stats(),
+        "adherence": adherence.cache.stats(),
+    }), 200
+
+
+@admin.route("/rollups/refresh", methods=["POST"])
+def refresh_rollups():
+    # ?rebuild=1 recomputes the cubes, picking up edits and deletes
+    if request.args.get("rebuild") == "1":
+        counts = rollups.rebuild_all()
+    else:
+        counts = rollups.refresh_all()
+    return jsonify({"message": "Rollups refreshed", "rows": counts}), 200
+
 
+@admin.route("/notifications/missed-workouts", methods=["POST"])
+def detect_missed_workouts():
+    per_coach = missed_workouts.detect()
+    return jsonify({
+        "message": "Missed workouts checked",
+        "notifications": sum(per_coach.values()),
+        "coaches": per_coach,
+    }), 200
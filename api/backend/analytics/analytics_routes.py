@@ -0,0 +1,215 @@
+from datetime import date
+
+from flask import Blueprint, jsonify, request
+from backend.db_connection import db as db_connection
+from backend.rollups import CUBES, GRAINS
+from backend.filters import date_range
+from backend.streaming import stream_rows
+
+analytics = Blueprint("analytics", __name__)
+
+
+def daily_nutrition(user_id=None):
+    """
+    Stream per-day calorie totals, grouped in SQL, for one client or (with
+    no user_id) for every client. Honours ?start_date= / ?end_date=.
+    """
+    query = (
+        "SELECT Meal_Date, COUNT(*) AS Meal_Count, COUNT(DISTINCT User_ID) AS Client_Count,"
+        " CAST(SUM(Calories) AS SIGNED) AS Total_Calories, ROUND(AVG(Calories), 1) AS Avg_Calories"
+        " FROM Meals WHERE Meal_Date IS NOT NULL"
+    )
+    params = []
+    
+    if user_id is not None:
+        query += " AND User_ID = %s"
+        params.append(user_id)
+    
+    query, params = date_range(query, params, "Meal_Date")
+    query += " GROUP BY Meal_Date ORDER BY Meal_Date"
+    
+    return stream_rows(db_connection.stream_query(query, tuple(params)))
+
+
+@analytics.route("/nutrition/daily", methods=["GET"])
+def get_daily_nutrition():
+    return daily_nutrition()
+
+
+COMPARE_DEFAULT_LIMIT = 10
+COMPARE_MAX_LIMIT = 100
+
+# Per-client meal statistics, busiest clients first. The window
+# functions total the grouped rows before ORDER BY/LIMIT trims them,
+# so the overall figures come back from the same single pass.
+CLIENT_COMPARISON = """
+SELECT User_ID AS Client_ID,
+       COUNT(*) AS Total_Meals,
+       COUNT(DISTINCT Meal_Date) AS Days_Active,
+       SUM(Calories) DIV COUNT(DISTINCT Meal_Date) AS Avg_Cal_Per_Day,
+       SUM(Calories) DIV COUNT(*) AS Avg_Cal_Per_Meal,
+       COUNT(*) OVER () AS Clients_Tracked,
+       CAST(SUM(COUNT(*)) OVER () AS SIGNED) AS Meals_Analyzed,
+       CAST(SUM(SUM(Calories)) OVER () AS SIGNED) AS Calories_Analyzed
+FROM Meals
+WHERE Meal_Date IS NOT NULL {since_filter}
+GROUP BY User_ID
+ORDER BY Total_Meals DESC, Client_ID
+LIMIT %s
+"""
+
+
+@analytics.route("/clients/compare", methods=["GET"])
+def compare_clients():
+    since = request.args.get("since")
+    limit = request.args.get("limit", COMPARE_DEFAULT_LIMIT)
+    error = None
+    
+    try:
+        limit = int(limit)
+    except ValueError:
+        error = "limit must be an integer"
+    
+    if error is None and limit < 1:
+        error = "limit must be at least 1"
+    
+    if error is None and since:
+        try:
+            since = date.fromisoformat(since)
+        except ValueError:
+            error = "since must be YYYY-MM-DD"
+    
+    if error is None:
+        params = []
+        since_filter = ""
+        if since:
+            since_filter = "AND Meal_Date >= %s"
+            params.append(since)
+        params.append(min(limit, COMPARE_MAX_LIMIT))
+        
+        rows = db_connection.execute_query(
+            CLIENT_COMPARISON.format(since_filter=since_filter), tuple(params)
+        )
+        
+        meals_analyzed = rows[0]["Meals_Analyzed"] if rows else 0
+        overall = {
+            "Clients_Tracked": rows[0]["Clients_Tracked"] if rows else 0,
+            "Meals_Analyzed": meals_analyzed,
+            "Avg_Cal_Per_Meal": rows[0]["Calories_Analyzed"] // meals_analyzed if rows else 0,
+        }
+        for row in rows:
+            del row["Clients_Tracked"], row["Meals_Analyzed"], row["Calories_Analyzed"]
+        
+        return jsonify({"clients": rows, "overall": overall}), 200
+    
+    return jsonify({"error": error}), 400
+
+
+# (name, lowest calories, first calories above the band); None is open-ended
+CALORIE_BANDS = [
+    ("very_low", None, 200),
+    ("low", 200, 400),
+    ("moderate", 400, 700),
+    ("high", 700, 1000),
+    ("very_high", 1000, None),
+]
+
+
+def _band_condition(low, high):
+    terms = []
+    if low is not None:
+        terms.append(f"Calories >= {low}")
+    if high is not None:
+        terms.append(f"Calories < {high}")
+    return " AND ".join(terms)
+
+
+# One pass over the matching meals: a row per hour of day (NULL for
+# meals without a time), each carrying that hour's calorie-band counts
+MEAL_PATTERNS = (
+    "SELECT HOUR(Meal_Time) AS Meal_Hour, COUNT(*) AS Meals, "
+    + ", ".join(
+        f"CAST(SUM({_band_condition(low, high)}) AS SIGNED) AS {name}"
+        for name, low, high in CALORIE_BANDS
+    )
+    + " FROM Meals WHERE 1=1"
+)
+
+
+@analytics.route("/meals/patterns", methods=["GET"])
+def get_meal_patterns():
+    """
+    Hour-of-day histogram, calorie-band counts and the most common meal
+    names, for every client or one (?client_id=), within ?start_date= /
+    ?end_date=.
+    """
+    client_id = request.args.get("client_id")
+    
+    query = ""
+    params = []
+    if client_id:
+        query += " AND User_ID = %s"
+        params.append(client_id)
+    query, params = date_range(query, params, "Meal_Date")
+    
+    hours = [0] * 24
+    untimed_meals = 0
+    bands = {name: 0 for name, _, _ in CALORIE_BANDS}
+    for row in db_connection.execute_query(MEAL_PATTERNS + query + " GROUP BY Meal_Hour", tuple(params)):
+        if row["Meal_Hour"] is None:
+            untimed_meals += row["Meals"]
+        else:
+            hours[row["Meal_Hour"]] = row["Meals"]
+        for name in bands:
+            bands[name] += row[name] or 0
+    
+    top_meals = db_connection.execute_query(
+        "SELECT Meal_Name, COUNT(*) AS Times FROM Meals WHERE 1=1" + query
+        + " GROUP BY Meal_Name ORDER BY Times DESC, Meal_Name LIMIT 10",
+        tuple(params)
+    )
+    
+    return jsonify({
+        "total_meals": sum(hours) + untimed_meals,
+        "hours": hours,
+        "untimed_meals": untimed_meals,
+        "calorie_bands": [
+            {"band": name, "min_calories": low, "max_calories": high, "meals": bands[name]}
+            for name, low, high in CALORIE_BANDS
+        ],
+        "top_meals": top_meals,
+    }), 200
+
+
+@analytics.route("/rollups/<cube_name>", methods=["GET"])
+def get_rollup(cube_name):
+    """
+    Meal or workout totals per ?interval= (day, week or month) between
+    ?start_date= and ?end_date=, optionally for one ?user_id=, read from
+    the pre-aggregated cubes. Rows are split by meal bucket / workout
+    type unless ?by_type=0.
+    """
+    cube = CUBES.get(cube_name)
+    interval = request.args.get("interval", "month")
+    user_id = request.args.get("user_id")
+    by_type = request.args.get("by_type", "1") != "0"
+    error = None
+    
+    if cube is None:
+        return jsonify({"error": f"Unknown rollup '{cube_name}'"}), 404
+    
+    if interval not in GRAINS:
+        error = f"interval must be one of {', '.join(GRAINS)}"
+    
+    if error is None:
+        try:
+            start = date.fromisoformat(request.args["start_date"]) if request.args.get("start_date") else None
+            end = date.fromisoformat(request.args["end_date"]) if request.args.get("end_date") else None
+        except ValueError:
+            error = "start_date and end_date must be YYYY-MM-DD"
+    
+    if error is None:
+        grain, rows = cube.query(interval, start, end, user_id, by_type)
+        return jsonify({"interval": interval, "grain": grain, "rows": rows}), 200
+    
+    return jsonify({"error": error}), 400
@@ -0,0 +1,144 @@
+#------------------------------------------------------------
+# Apache Arrow IPC and Parquet exports.
+#
+# Rows come off a server-side cursor in fetchmany() batches
+# (db.stream_batches), each batch becomes one Arrow record
+# batch typed from cursor.description, and the encoded bytes
+# are sent as a chunked response as soon as they are written.
+# pyarrow / pandas read the result straight into columns with
+# no JSON parsing at all.
+#------------------------------------------------------------
+import pyarrow as pa
+import pyarrow.parquet as pq
+from flask import Response, stream_with_context
+from pymysql.constants import FIELD_TYPE
+
+from backend.db_connection import db as db_connection
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MIMETYPE = "application/vnd.apache.parquet"
+
+# rows per record batch (and per Parquet row group)
+EXPORT_BATCH_ROWS = 10000
+
+
+def _date_or_none(value):
+    # PyMySQL hands back zero dates like '0000-00-00' as plain strings
+    return None if value.__class__ is str else value
+
+
+# MySQL column type -> (Arrow type, converter or None). Anything not
+# listed is exported as text.
+_ARROW_TYPES = {
+    FIELD_TYPE.TINY: (pa.int64(), None),
+    FIELD_TYPE.SHORT: (pa.int64(), None),
+    FIELD_TYPE.INT24: (pa.int64(), None),
+    FIELD_TYPE.LONG: (pa.int64(), None),
+    FIELD_TYPE.LONGLONG: (pa.int64(), None),
+    FIELD_TYPE.YEAR: (pa.int64(), None),
+    FIELD_TYPE.FLOAT: (pa.float64(), None),
+    FIELD_TYPE.DOUBLE: (pa.float64(), None),
+    FIELD_TYPE.DECIMAL: (pa.float64(), float),
+    FIELD_TYPE.NEWDECIMAL: (pa.float64(), float),
+    FIELD_TYPE.DATE: (pa.date32(), _date_or_none),
+    FIELD_TYPE.NEWDATE: (pa.date32(), _date_or_none),
+    FIELD_TYPE.DATETIME: (pa.timestamp("us"), _date_or_none),
+    FIELD_TYPE.TIMESTAMP: (pa.timestamp("us"), _date_or_none),
+    FIELD_TYPE.TIME: (pa.duration("us"), None),
+}
+_TEXT = (pa.string(), str)
+
+
+class _BatchWriter:
+    """Turns DictCursor batches into Arrow record batches of one schema."""
+
+    def __init__(self, description):
+        self.types = [_ARROW_TYPES.get(column[1], _TEXT) for column in description]
+        self.schema = pa.schema(
+            [(column[0], arrow_type) for column, (arrow_type, _) in zip(description, self.types)]
+        )
+        self.names = None
+
+    def record_batch(self, rows):
+        if self.names is None:
+            # DictCursor renames duplicate columns to "table.column"
+            self.names = list(rows[0])
+        arrays = []
+        for name, (arrow_type, convert) in zip(self.names, self.types):
+            values = [row[name] for row in rows]
+            if convert is not None:
+                values = [None if value is None else convert(value) for value in values]
+            arrays.append(pa.array(values, type=arrow_type))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class _ChunkSink:
+    """File-like object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+        self.position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _export_chunks(query, params, open_writer):
+    sink = _ChunkSink()
+    writer = None
+    batch_writer = None
+    for description, rows in db_connection.stream_batches(query, params, EXPORT_BATCH_ROWS):
+        if writer is None:
+            batch_writer = _BatchWriter(description)
+            writer = open_writer(sink, batch_writer.schema)
+        if rows:
+            writer.write_batch(batch_writer.record_batch(rows))
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+def _open_ipc_stream(sink, schema):
+    return pa.ipc.new_stream(sink, schema)
+
+
+def _open_parquet(sink, schema):
+    return pq.ParquetWriter(sink, schema, compression="zstd")
+
+
+def _export_response(query, params, open_writer, mimetype, filename):
+    body = stream_with_context(
+        chunk for chunk in _export_chunks(query, tuple(params), open_writer) if chunk
+    )
+    response = Response(body, mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def arrow_response(query, params, filename):
+    """Stream a query result as an Arrow IPC stream (pyarrow.ipc.open_stream)."""
+    return _export_response(query, params, _open_ipc_stream, ARROW_MIMETYPE, filename)
+
+
+def parquet_response(query, params, filename):
+    """Stream a query result as a Parquet file, one row group per batch."""
+    return _export_response(query, params, _open_parquet, PARQUET_MIMETYPE, filename)
@@ -1,102 +1,181 @@
+from datetime import date, timedelta
+
 from flask import Blueprint, jsonify, request
+from backend.analytics.analytics_routes import daily_nutrition
+from backend.arrow_export import arrow_response, parquet_response
 from backend.db_connection import db as db_connection
-from datetime import datetime, date, time, timedelta
-import decimal
-
-def get_db():
-    return db_connection.get_db().cursor()
-
-def serialize_row(row):
-    """Convert database row to JSON-serializable dict"""
-    if row is None:
-        return None
-    result = {}
-    for key, value in row.items():
-        if isinstance(value, (datetime, date)):
-            result[key] = value.isoformat() if value else None
-        elif isinstance(value, time):
-            result[key] = str(value) if value else None
-        elif isinstance(value, timedelta):
-            result[key] = str(value) if value else None
-        elif isinstance(value, decimal.Decimal):
-            result[key] = float(value) if value is not None else None
-        else:
-            result[key] = value
-    return result
-
-def serialize_rows(rows):
-    """Convert list of database rows to JSON-serializable list"""
-    return [serialize_row(row) for row in rows] if rows else []
+from backend.filters import date_range
+from backend.pagination import Keyset, paginated_rows
+from backend.response_cache import responses
+from backend.streaming import stream_rows
 
 clients = Blueprint("clients", __name__)
 
+MEAL_ORDER = Keyset(("Meal_Date", True), ("Meal_Time", True), ("Meal_ID", True))
+WORKOUT_ORDER = Keyset(("Workout_Date", True), ("Workout_ID", True))
+GOAL_ORDER = Keyset(("start_time", True), ("goal_id", True))
+
+# upper bounds for the dashboard lists; a day rarely has more than a few
+DASHBOARD_GOALS = 20
+DASHBOARD_DAY_ROWS = 50
+
 
 @clients.route("/<int:client_id>/workouts", methods=["GET"])
+@responses.cached(view_arg="client_id")
 def get_client_workouts(client_id):
-    db = get_db()
-    db.execute("SELECT * FROM Workouts WHERE User_ID = %s ORDER BY Workout_Date DESC", (client_id,))
-    workouts = db.fetchall()
-    db.close()
-    
-    serialized_workouts = serialize_rows(workouts)
-    return jsonify(serialized_workouts), 200
+    # streams straight from a server-side cursor unless a page is requested;
+    # long-time users have years of logs
+    return paginated_rows(WORKOUT_ORDER, "SELECT * FROM Workouts WHERE User_ID = %s", (client_id,), columnar=True)
 
 
 @clients.route("/<int:client_id>/nutrition", methods=["GET"])
+@responses.cached(view_arg="client_id")
 def get_client_nutrition(client_id):
-    start_date = request.args.get("start_date")
-    end_date = request.args.get("end_date")
     meal_type = request.args.get("meal_type")
     
-    query = "SELECT * FROM Meals WHERE User_ID = %s"
-    params = [client_id]
+    query, params = date_range("SELECT * FROM Meals WHERE User_ID = %s", [client_id], "Meal_Date")
     
-    if start_date:
-        query += " AND Meal_Date >= %s"
-        params.append(start_date)
-    if end_date:
-        query += " AND Meal_Date <= %s"
-        params.append(end_date)
     if meal_type:
         query += " AND Meal_Type = %s"
         params.append(meal_type)
     
-    query += " ORDER BY Meal_Date DESC, Meal_Time DESC"
+    return paginated_rows(MEAL_ORDER, query, params, columnar=True)
+
+
+@clients.route("/<int:client_id>/nutrition/daily", methods=["GET"])
+def get_client_daily_nutrition(client_id):
+    return daily_nutrition(client_id)
+
+
+@clients.route("/<int:client_id>/dashboard", methods=["GET"])
+def get_client_dashboard(client_id):
+    """
+    Everything the client home page shows, in one response: active goals,
+    the day's meals and workouts, and totals for the last 7 days and all
+    time. ?date= picks the day (default today). Each part is a bounded
+    lookup on an index led by the user id, and all of them run on the
+    request's one pooled connection.
+    """
+    error = None
     
-    db = get_db()
-    db.execute(query, tuple(params))
-    nutrition_data = db.fetchall()
-    db.close()
+    try:
+        day = date.fromisoformat(request.args["date"]) if request.args.get("date") else date.today()
+    except ValueError:
+        error = "date must be YYYY-MM-DD"
     
-    serialized_nutrition = serialize_rows(nutrition_data)
-    return jsonify(serialized_nutrition), 200
+    if error is None:
+        week_start = day - timedelta(days=6)
+        
+        goals = db_connection.execute_query(
+            "SELECT goal_id, goal_type, start_time, end_time FROM Goals "
+            "WHERE user_id = %s AND start_time <= %s AND (end_time IS NULL OR end_time >= %s) "
+            "ORDER BY start_time DESC LIMIT %s",
+            (client_id, day, day, DASHBOARD_GOALS)
+        )
+        meals = db_connection.execute_query(
+            "SELECT Meal_ID, Meal_Name, Calories, Meal_Time FROM Meals "
+            "WHERE User_ID = %s AND Meal_Date = %s ORDER BY Meal_Time LIMIT %s",
+            (client_id, day, DASHBOARD_DAY_ROWS)
+        )
+        workouts = db_connection.execute_query(
+            "SELECT Workout_ID, Workout_Type, Duration_Minutes, Calories_Burned FROM Workouts "
+            "WHERE User_ID = %s AND Workout_Date = %s ORDER BY Workout_ID LIMIT %s",
+            (client_id, day, DASHBOARD_DAY_ROWS)
+        )
+        # both totals are primary key range scans of DailyUserSummary
+        totals = db_connection.execute_query(
+            "SELECT summary_date >= %s AS in_week, "
+            "CAST(SUM(calories_in) AS SIGNED) AS calories_in, "
+            "CAST(SUM(calories_burned) AS SIGNED) AS calories_burned, "
+            "CAST(SUM(meal_count) AS SIGNED) AS meal_count, "
+            "CAST(SUM(workout_count) AS SIGNED) AS workout_count, "
+            "CAST(SUM(workout_minutes) AS SIGNED) AS workout_minutes, "
+            "COUNT(*) AS active_days "
+            "FROM DailyUserSummary WHERE user_id = %s AND summary_date <= %s "
+            "GROUP BY in_week",
+            (week_start, client_id, day)
+        )
+        
+        empty = {
+            "calories_in": 0, "calories_burned": 0, "meal_count": 0,
+            "workout_count": 0, "workout_minutes": 0, "active_days": 0,
+        }
+        week = dict(empty)
+        all_time = dict(empty)
+        for row in totals:
+            in_week = row.pop("in_week")
+            for key, value in row.items():
+                all_time[key] += value
+                if in_week:
+                    week[key] += value
+        
+        return jsonify({
+            "date": day,
+            "goals": goals,
+            "meals": meals,
+            "workouts": workouts,
+            "week": {"start": week_start, "end": day, **week},
+            "all_time": all_time,
+        }), 200
+    
+    return jsonify({"error": error}), 400
+
+
+@clients.route("/<int:client_id>/summary", methods=["GET"])
+@responses.cached(view_arg="client_id")
+def get_client_summary(client_id):
+    # DailyUserSummary is keyed by (user_id, summary_date), so this is a
+    # primary key range scan however many meals and workouts the user has
+    query, params = date_range(
+        "SELECT * FROM DailyUserSummary WHERE user_id = %s", [client_id], "summary_date"
+    )
+    query += " ORDER BY summary_date"
+    return stream_rows(db_connection.stream_query(query, tuple(params)))
 
 
 @clients.route("/<int:client_id>/meals", methods=["GET"])
+@responses.cached(view_arg="client_id")
 def get_client_meals(client_id):
-    db = get_db()
-    db.execute("SELECT * FROM Meals WHERE User_ID = %s ORDER BY Meal_Date DESC, Meal_Time DESC", (client_id,))
-    meals = db.fetchall()
-    db.close()
-    
-    serialized_meals = serialize_rows(meals)
-    return jsonify(serialized_meals), 200
+    return paginated_rows(MEAL_ORDER, "SELECT * FROM Meals WHERE User_ID = %s", (client_id,), columnar=True)
+
+
+@clients.route("/<int:client_id>/meals.arrow", methods=["GET"])
+def export_client_meals(client_id):
+    query, params = date_range("SELECT * FROM Meals WHERE User_ID = %s", [client_id], "Meal_Date")
+    query += f" ORDER BY {MEAL_ORDER.order_by()}"
+    return arrow_response(query, params, f"client_{client_id}_meals.arrow")
+
+
+@clients.route("/<int:client_id>/workouts.arrow", methods=["GET"])
+def export_client_workouts(client_id):
+    query, params = date_range("SELECT * FROM Workouts WHERE User_ID = %s", [client_id], "Workout_Date")
+    query += f" ORDER BY {WORKOUT_ORDER.order_by()}"
+    return arrow_response(query, params, f"client_{client_id}_workouts.arrow")
+
+
+@clients.route("/meals.parquet", methods=["GET"])
+def export_meals():
+    # every client's meals, for offline analysis
+    query, params = date_range("SELECT * FROM Meals WHERE 1=1", [], "Meal_Date")
+    query += " ORDER BY User_ID, Meal_Date, Meal_ID"
+    return parquet_response(query, params, "meals.parquet")
+
+
+@clients.route("/workouts.parquet", methods=["GET"])
+def export_workouts():
+    query, params = date_range("SELECT * FROM Workouts WHERE 1=1", [], "Workout_Date")
+    query += " ORDER BY User_ID, Workout_Date, Workout_ID"
+    return parquet_response(query, params, "workouts.parquet")
 
 
 @clients.route("/goals", methods=["GET"])
+@responses.cached(query_arg="user_id")
 def get_goals():
     user_id = request.args.get("user_id")
     
-    db = get_db()
     if user_id:
-        db.execute("SELECT * FROM Goals WHERE user_id = %s ORDER BY start_time DESC", (user_id,))
-    else:
-        db.execute("SELECT * FROM Goals ORDER BY start_time DESC")
-    goals = db.fetchall()
-    db.close()
-    
-    serialized_goals = serialize_rows(goals)
-    return jsonify(serialized_goals), 200
+        return paginated_rows(GOAL_ORDER, "SELECT * FROM Goals WHERE user_id = %s", (user_id,))
+    return paginated_rows(GOAL_ORDER, "SELECT * FROM Goals WHERE 1=1", ())
 
 
 @clients.route("/goals", methods=["POST"])
@@ -114,19 +193,16 @@ def create_goal():
         error = "start_time is required"
     
     if error is None:
-        db = get_db()
         user_id = data.get("User_ID") or data.get("user_id")
         goal_type = data.get("Goal_Type") or data.get("goal_type")
         start_time = data.get("start_time") or data.get("Start_Time") or data.get("Target_Date")
         end_time = data.get("end_time") or data.get("End_Time") or data.get("Target_Date")
         
-        db.execute(
+        goal_id = db_connection.insert_query(
             "INSERT INTO Goals (user_id, goal_type, start_time, end_time) VALUES (%s, %s, %s, %s)",
             (user_id, goal_type, start_time, end_time)
         )
-        db_connection.get_db().commit()
-        goal_id = db.lastrowid
-        db.close()
+        responses.invalidate(user_id)
         return jsonify({"message": "Goal created successfully", "goal_id": goal_id}), 201
     
     return jsonify({"error": error}), 400
@@ -137,9 +213,7 @@ def update_goal(goal_id):
     data = request.get_json()
     error = None
     
-    db = get_db()
-    db.execute("SELECT * FROM Goals WHERE goal_id = %s", (goal_id,))
-    goal = db.fetchone()
+    goal = db_connection.fetch_one("SELECT * FROM Goals WHERE goal_id = %s", (goal_id,))
     
     if goal is None:
         error = "Goal not found"
@@ -170,12 +244,10 @@ def update_goal(goal_id):
     
     if error is None:
         params.append(goal_id)
-        db.execute(f"UPDATE Goals SET {', '.join(update_fields)} WHERE goal_id = %s", tuple(params))
-        db_connection.get_db().commit()
-        db.close()
+        db_connection.update_query(f"UPDATE Goals SET {', '.join(update_fields)} WHERE goal_id = %s", tuple(params))
+        responses.invalidate(goal["user_id"])
         return jsonify({"message": "Goal updated successfully"}), 200
     
-    db.close()
     if error == "Goal not found":
         return jsonify({"error": error}), 404
     return jsonify({"error": error}), 400
@@ -183,33 +255,33 @@ def update_goal(goal_id):
 
 @clients.route("/goals/<int:goal_id>", methods=["DELETE"])
 def delete_goal(goal_id):
-    db = get_db()
-    db.execute("SELECT * FROM Goals WHERE goal_id = %s", (goal_id,))
-    goal = db.fetchone()
+    goal = db_connection.fetch_one("SELECT * FROM Goals WHERE goal_id = %s", (goal_id,))
     
     error = None
     if goal is None:
         error = "Goal not found"
     
     if error is None:
-        db.execute("DELETE FROM Goals WHERE goal_id = %s", (goal_id,))
-        db_connection.get_db().commit()
-        db.close()
+        db_connection.update_query("DELETE FROM Goals WHERE goal_id = %s", (goal_id,))
+        responses.invalidate(goal["user_id"])
         return jsonify({"message": "Goal deleted successfully"}), 200
     
-    db.close()
     return jsonify({"error": error}), 404
 
 
 @clients.route("/coaches/<int:coach_id>/notifications", methods=["GET"])
 def get_coach_notifications(coach_id):
-    db = get_db()
-    db.execute(
-        "SELECT * FROM Notifications WHERE Coach_ID = %s AND Notification_Type = 'missed_workout' ORDER BY Notification_Date DESC",
+    # written by the missed-workout detector (backend/missed_workouts.py)
+    notifications = db_connection.stream_query(
+        "SELECT n.notif_id, n.coach_id, n.client_id, c.user_id, u.fname, u.lname, "
+        "n.sent_date, n.notif_type, n.about_date, n.body_text "
+        "FROM Notifications n "
+        "JOIN Clients c ON c.client_id = n.client_id "
+        "JOIN Users u ON u.user_id = c.user_id "
+        "WHERE n.coach_id = %s AND n.notif_type = 'missed_workout' "
+        "ORDER BY n.sent_date DESC, n.notif_id DESC",
         (coach_id,)
     )
-    notifications = db.fetchall()
-    db.close()
     
-    return jsonify(notifications), 200
+    return stream_rows(notifications)
 
@@ -1,8 +1,62 @@
+from datetime import date, timedelta
+
 from flask import Blueprint, jsonify, request
+from backend import adherence
 from backend.db_connection import db as db_connection
+from backend.pagination import Keyset, paginated_list
+from backend.streaming import stream_rows
 
 coach_bp = Blueprint("coach", __name__, url_prefix="/coaches")
 
+# a coach's roster is every client they have assigned a workout plan to
+ROSTER_QUERY = """
+    SELECT DISTINCT c.client_id, c.user_id, u.fname, u.lname
+    FROM WorkoutPlans wp
+    JOIN Clients c ON c.client_id = wp.client_id
+    JOIN Users u ON u.user_id = c.user_id
+    WHERE wp.coach_id = %s
+"""
+
+ALERT_ORDER = Keyset(("last_log_date", False), ("client_id", False))
+
+ACTIVITY_DEFAULT_PER_CLIENT = 5
+ACTIVITY_MAX_PER_CLIENT = 50
+
+# the latest workouts and meals of every client on the roster, numbered
+# newest first within each client and activity type so one statement
+# can keep the top N of each
+ACTIVITY_QUERY = f"""
+    WITH roster AS ({ROSTER_QUERY}),
+    activity AS (
+        SELECT 'workout' AS activity_type, w.Workout_ID AS activity_id, r.client_id, r.user_id,
+               r.fname, r.lname, w.Workout_Date AS activity_date, NULL AS activity_time,
+               w.Workout_Type AS name, w.Duration_Minutes AS duration_minutes,
+               w.Calories_Burned AS calories_burned, NULL AS calories,
+               ROW_NUMBER() OVER (
+                   PARTITION BY w.User_ID ORDER BY w.Workout_Date DESC, w.Workout_ID DESC
+               ) AS position
+        FROM roster r
+        JOIN Workouts w ON w.User_ID = r.user_id
+        WHERE w.Workout_Date >= %s
+        UNION ALL
+        SELECT 'meal', m.Meal_ID, r.client_id, r.user_id,
+               r.fname, r.lname, m.Meal_Date, m.Meal_Time,
+               m.Meal_Name, NULL,
+               NULL, m.Calories,
+               ROW_NUMBER() OVER (
+                   PARTITION BY m.User_ID ORDER BY m.Meal_Date DESC, m.Meal_Time DESC, m.Meal_ID DESC
+               )
+        FROM roster r
+        JOIN Meals m ON m.User_ID = r.user_id
+        WHERE m.Meal_Date >= %s
+    )
+    SELECT activity_type, activity_id, client_id, user_id, fname, lname, activity_date,
+           activity_time, name, duration_minutes, calories_burned, calories
+    FROM activity
+    WHERE position <= %s
+    ORDER BY activity_date DESC, activity_time IS NULL, activity_time DESC, activity_type, activity_id DESC
+"""
+
 
 @coach_bp.route("/", methods=["GET"])
 def get_all_coaches():
@@ -10,8 +64,8 @@ def get_all_coaches():
         SELECT coach_id, user_id, specialization, terminator
         FROM Coaches
     """
-    result = db_connection.execute_query(query)
-    return jsonify(result), 200
+    result = db_connection.stream_query(query)
+    return stream_rows(result)
 
 
 @coach_bp.route("/<int:coach_id>", methods=["GET"])
@@ -143,3 +197,51 @@ def delete_coach(coach_id):
     )
 
     return jsonify({"message": "Coach deleted"}), 200
+
+
+@coach_bp.route("/<int:coach_id>/activity", methods=["GET"])
+def get_coach_activity(coach_id):
+    """
+    Merged feed of the latest ?per_client= workouts and meals of each
+    client on the coach's roster, newest first, from the last ?days=
+    days (default 30). One query for the whole roster.
+    """
+    per_client = request.args.get("per_client", ACTIVITY_DEFAULT_PER_CLIENT, type=int)
+    days = request.args.get("days", 30, type=int)
+
+    if per_client < 1 or per_client > ACTIVITY_MAX_PER_CLIENT:
+        return jsonify({"error": f"per_client must be between 1 and {ACTIVITY_MAX_PER_CLIENT}"}), 400
+    if days < 1:
+        return jsonify({"error": "days must be at least 1"}), 400
+
+    # the date bound keeps each client's window to an index range
+    # instead of their whole history
+    since = date.today() - timedelta(days=days - 1)
+    result = db_connection.stream_query(ACTIVITY_QUERY, (coach_id, since, since, per_client))
+    return stream_rows(result)
+
+
+@coach_bp.route("/<int:coach_id>/alerts/nutrition", methods=["GET"])
+def get_coach_nutrition_alerts(coach_id):
+    """
+    Clients on the coach's roster who have logged no meals for
+    ?min_days= days or more (default 3), or never, most urgent first,
+    paged with ?limit/?after. ?all=1 lists every roster client with
+    their adherence numbers instead.
+    """
+    min_days = request.args.get("min_days", adherence.ALERT_AFTER_DAYS, type=int)
+    show_all = request.args.get("all") == "1"
+
+    if min_days < 1:
+        return jsonify({"error": "min_days must be at least 1"}), 400
+
+    roster = {row["client_id"] for row in db_connection.execute_query(ROSTER_QUERY, (coach_id,))}
+    rows = [
+        row for row in adherence.all_clients()
+        if row["client_id"] in roster and (
+            show_all
+            or row["days_since_last_log"] is None
+            or row["days_since_last_log"] >= min_days
+        )
+    ]
+    return paginated_list(ALERT_ORDER, rows, adherence.sort_key)
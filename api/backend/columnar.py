@@ -0,0 +1,68 @@
+#------------------------------------------------------------
+# Column-oriented responses for analytics consumers.
+#
+# ?format=columnar returns
+#   {"columns": [...], "row_count": N,
+#    "data": {"Calories": [...],
+#             "Meal_Name": {"dictionary": [...], "indices": [...]}}}
+# Text columns with many repeated values (Meal_Name,
+# Workout_Type) are dictionary encoded: each distinct string is
+# sent once and rows refer to it by position. Pandas can load
+# the result with one DataFrame(...) call per column instead of
+# walking a list of dicts.
+#------------------------------------------------------------
+from flask import jsonify, request
+
+# dictionary encode a text column when at most this share of
+# its values are distinct
+DICTIONARY_MAX_DISTINCT_RATIO = 0.5
+
+
+def wants_columnar():
+    return request.args.get("format") == "columnar"
+
+
+def to_columnar(rows):
+    """Pivot an iterable of row dicts into the columnar payload."""
+    columns = None
+    data = None
+    row_count = 0
+    for row in rows:
+        if columns is None:
+            columns = list(row)
+            data = [[] for _ in columns]
+        for values, value in zip(data, row.values()):
+            values.append(value)
+        row_count += 1
+
+    if columns is None:
+        return {"columns": [], "row_count": 0, "data": {}}
+
+    return {
+        "columns": columns,
+        "row_count": row_count,
+        "data": {name: _encode(values) for name, values in zip(columns, data)},
+    }
+
+
+def _encode(values):
+    if not any(isinstance(value, str) for value in values):
+        return values
+
+    positions = {}
+    for value in values:
+        if value is not None and value not in positions:
+            positions[value] = len(positions)
+    if len(positions) > len(values) * DICTIONARY_MAX_DISTINCT_RATIO:
+        return values
+
+    return {
+        "dictionary": list(positions),
+        "indices": [None if value is None else positions[value] for value in values],
+    }
+
+
+def columnar_response(rows, status=200):
+    response = jsonify(to_columnar(rows))
+    response.status_code = status
+    return response
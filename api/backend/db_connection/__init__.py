@@ -1,10 +1,216 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import g, has_app_context
 from pymysql import cursors
 
+from backend.db_connection.pool import ConnectionPool, PoolExhausted
+from backend.db_connection.statements import StatementCache
+
+logger = logging.getLogger(__name__)
+
+
+class PooledMySQL:
+    """
+    Drop-in replacement for flaskext.mysql.MySQL that borrows connections
+    from a ConnectionPool instead of opening a new one per app context.
+
+    Blueprints keep calling db.get_db(); the connection is checked out the
+    first time a request asks for it and returned when the app context
+    tears down. The execute_query()/insert_query() helpers run a statement
+    on that same connection and take care of cursors, commits and timing.
+    """
+
+    def __init__(self, app=None, **connect_kwargs):
+        self.connect_kwargs = connect_kwargs
+        self.pool = None
+        self.statements = StatementCache()
+        self.slow_query_ms = 200
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        config.setdefault("MYSQL_DATABASE_HOST", "localhost")
+        config.setdefault("MYSQL_DATABASE_PORT", 3306)
+        config.setdefault("MYSQL_DATABASE_CHARSET", "utf8mb4")
+        config.setdefault("MYSQL_POOL_MIN_SIZE", 1)
+        config.setdefault("MYSQL_POOL_MAX_SIZE", 10)
+        config.setdefault("MYSQL_POOL_MAX_IDLE", 300)
+        config.setdefault("MYSQL_POOL_MAX_LIFETIME", 3600)
+        config.setdefault("MYSQL_POOL_CHECKOUT_TIMEOUT", 10)
+        config.setdefault("MYSQL_POOL_PING_INTERVAL", 0)
+        config.setdefault("MYSQL_SLOW_QUERY_MS", 200)
+        self.slow_query_ms = config["MYSQL_SLOW_QUERY_MS"]
+
+        connect_kwargs = {
+            "host": config["MYSQL_DATABASE_HOST"],
+            "port": config["MYSQL_DATABASE_PORT"],
+            "user": config.get("MYSQL_DATABASE_USER"),
+            "password": config.get("MYSQL_DATABASE_PASSWORD"),
+            "database": config.get("MYSQL_DATABASE_DB"),
+            "charset": config["MYSQL_DATABASE_CHARSET"],
+        }
+        connect_kwargs.update(self.connect_kwargs)
+
+        self.pool = ConnectionPool(
+            connect_kwargs,
+            min_size=config["MYSQL_POOL_MIN_SIZE"],
+            max_size=config["MYSQL_POOL_MAX_SIZE"],
+            max_idle=config["MYSQL_POOL_MAX_IDLE"],
+            max_lifetime=config["MYSQL_POOL_MAX_LIFETIME"],
+            checkout_timeout=config["MYSQL_POOL_CHECKOUT_TIMEOUT"],
+            ping_interval=config["MYSQL_POOL_PING_INTERVAL"],
+        )
+        # open min_size connections now so the first requests do not pay for
+        # the handshake; if the database is not up yet, requests connect lazily
+        try:
+            self.pool.fill()
+        except Exception as error:
+            logger.warning("could not pre-open database connections: %s", error)
+        app.teardown_appcontext(self.teardown_request)
+
+    def connect(self):
+        """Borrow a connection outside of a request; pair with release()."""
+        return self.pool.checkout()
+
+    def release(self, conn):
+        self.pool.checkin(conn)
+
+    def get_db(self):
+        """Return this app context's connection, borrowing one on first use."""
+        if "mysql_db" not in g:
+            g.mysql_db = self.pool.checkout()
+        return g.mysql_db
+
+    def teardown_request(self, exception):
+        conn = g.pop("mysql_db", None)
+        if conn is not None:
+            self.pool.checkin(conn)
+
+    def pool_stats(self):
+        return self.pool.stats() if self.pool is not None else {}
+
+    def statement_stats(self):
+        return self.statements.stats()
+
+    @contextmanager
+    def connection(self):
+        """
+        Yield a connection: the request's own inside an app context,
+        otherwise one borrowed from the pool for the duration of the block
+        (for CLI commands and background jobs).
+        """
+        if has_app_context():
+            yield self.get_db()
+            return
+        conn = self.pool.checkout()
+        try:
+            yield conn
+        finally:
+            self.pool.checkin(conn)
+
+    def execute_query(self, query, params=None, commit=False):
+        """Run a statement and return its rows as a list of dicts."""
+        with self._run(query, params, commit) as cursor:
+            return list(cursor.fetchall())
+
+    def fetch_one(self, query, params=None):
+        """Run a query and return its first row, or None."""
+        with self._run(query, params, False) as cursor:
+            return cursor.fetchone()
+
+    def insert_query(self, query, params=None):
+        """Run an INSERT, commit it and return the new row's id."""
+        with self._run(query, params, True) as cursor:
+            return cursor.lastrowid
+
+    def update_query(self, query, params=None):
+        """Run an UPDATE/DELETE, commit it and return the affected row count."""
+        with self._run(query, params, True) as cursor:
+            return cursor.rowcount
+
+    @contextmanager
+    def transaction(self):
+        """
+        Yield a cursor whose statements are committed together when the
+        block finishes, or rolled back if it raises.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def stream_query(self, query, params=None, batch_size=500):
+        """
+        Yield rows one at a time from an unbuffered server-side cursor, so
+        large results never sit in memory all at once. The connection is
+        busy until the generator is exhausted or closed.
+        """
+        for _, batch in self.stream_batches(query, params, batch_size):
+            yield from batch
+
+    def stream_batches(self, query, params=None, batch_size=500):
+        """
+        Like stream_query() but yield (cursor.description, rows) once per
+        fetchmany() batch, for consumers that build columns by type. An
+        empty result still yields one empty batch, so the columns are known.
+        """
+        statement = self.statements.get(query)
+        with self.connection() as conn:
+            cursor = conn.cursor(cursors.SSDictCursor)
+            started = time.perf_counter()
+            rows = 0
+            try:
+                cursor.execute(statement.sql, params)
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch and rows:
+                        break
+                    rows += len(batch)
+                    yield cursor.description, batch
+                    if not batch:
+                        break
+            finally:
+                # closing an unbuffered cursor drains whatever the server
+                # still has queued, which keeps the connection reusable
+                cursor.close()
+                self._record(statement, time.perf_counter() - started, rows)
+
+    @contextmanager
+    def _run(self, query, params, commit):
+        statement = self.statements.get(query)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            started = time.perf_counter()
+            try:
+                cursor.execute(statement.sql, params)
+                if commit:
+                    conn.commit()
+                yield cursor
+            finally:
+                rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+                cursor.close()
+                self._record(statement, time.perf_counter() - started, rows)
+
+    def _record(self, statement, elapsed, rows):
+        self.statements.record(statement, elapsed, rows)
+        if elapsed * 1000 >= self.slow_query_ms:
+            logger.warning(
+                "Slow query (%.1f ms, %d rows): %s", elapsed * 1000, rows, statement.sql
+            )
+
 
-# the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+# the parameter instructs the connection to return data
+# as a dictionary object.
+db = PooledMySQL(cursorclass=cursors.DictCursor)
@@ -0,0 +1,269 @@
+#------------------------------------------------------------
+# A small bounded pool of PyMySQL connections.
+#
+# Connections are handed out LIFO so the hot ones stay warm,
+# pinged on checkout, and retired once they have been idle
+# or alive for too long. The pool opens min_size connections
+# up front and tops itself back up in the background whenever
+# closing one leaves it below that.
+#------------------------------------------------------------
+import logging
+import threading
+import time
+from collections import deque
+
+import pymysql
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhausted(Exception):
+    """Raised when no connection frees up within the checkout timeout."""
+
+
+class _PooledConnection:
+    """Book-keeping wrapper around one raw PyMySQL connection."""
+
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    def __init__(self, connect_kwargs, min_size=1, max_size=10,
+                 max_idle=300, max_lifetime=3600, checkout_timeout=10,
+                 ping_interval=0):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size > max_size:
+            raise ValueError("min_size cannot be larger than max_size")
+
+        self.connect_kwargs = dict(connect_kwargs)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        # connections used within the last ping_interval seconds are
+        # trusted without a round trip; 0 pings on every checkout
+        self.ping_interval = ping_interval
+
+        self._idle = deque()
+        self._in_use = {}
+        self._pending = 0
+        self._closed = False
+        self._filling = False
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+        self._stats = {
+            "checkouts": 0,
+            "exhausted": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "created": 0,
+            "closed": 0,
+            "ping_failures": 0,
+        }
+
+    # -- public API ------------------------------------------------
+
+    def checkout(self):
+        """Return a live raw connection, waiting up to checkout_timeout."""
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        waited = False
+
+        while True:
+            with self._available:
+                pooled = None
+                while pooled is None:
+                    self._evict_idle_locked()
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        if self._is_expired(pooled, time.monotonic()):
+                            self._close_locked(pooled)
+                            pooled = None
+                            continue
+                        # count it as in use while we ping it
+                        self._in_use[id(pooled.raw)] = pooled
+                    elif self._size_locked() < self.max_size:
+                        self._pending += 1
+                        break
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["exhausted"] += 1
+                            raise PoolExhausted(
+                                f"no database connection available after "
+                                f"{self.checkout_timeout}s (max_size={self.max_size})"
+                            )
+                        waited = True
+                        self._available.wait(remaining)
+
+            if pooled is None:
+                # we reserved a free slot; open the connection outside the lock
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._available:
+                        self._pending -= 1
+                        self._available.notify()
+                    raise
+                with self._available:
+                    self._pending -= 1
+                    self._stats["created"] += 1
+                    return self._hand_out_locked(_PooledConnection(raw), started, waited)
+
+            if self._is_alive(pooled):
+                with self._available:
+                    return self._hand_out_locked(pooled, started, waited)
+
+            with self._available:
+                self._stats["ping_failures"] += 1
+                del self._in_use[id(pooled.raw)]
+                self._close_locked(pooled)
+                self._available.notify()
+
+    def checkin(self, raw):
+        """Give a connection back to the pool."""
+        with self._available:
+            pooled = self._in_use.get(id(raw))
+            if pooled is None:
+                return
+
+        healthy = raw.open
+        if healthy:
+            # end any transaction the borrower left open so the next one
+            # does not inherit its snapshot or its row locks
+            try:
+                raw.rollback()
+            except pymysql.MySQLError:
+                healthy = False
+
+        with self._available:
+            del self._in_use[id(raw)]
+            now = time.monotonic()
+            if not healthy or self._closed or self._is_expired(pooled, now):
+                self._close_locked(pooled)
+            else:
+                pooled.last_used = now
+                self._idle.append(pooled)
+            self._available.notify()
+
+    def discard(self, raw):
+        """Drop a checked-out connection that is known to be broken."""
+        with self._available:
+            pooled = self._in_use.pop(id(raw), None)
+            if pooled is not None:
+                self._close_locked(pooled)
+            self._available.notify()
+
+    def fill(self):
+        """Open connections until at least min_size exist."""
+        while True:
+            with self._lock:
+                if self._closed or self._size_locked() >= self.min_size:
+                    return
+                self._pending += 1
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._available:
+                    self._pending -= 1
+                raise
+            with self._available:
+                self._pending -= 1
+                self._stats["created"] += 1
+                self._idle.appendleft(_PooledConnection(raw))
+                self._available.notify()
+
+    def close(self):
+        """Close idle connections; checked-out ones close when returned."""
+        with self._available:
+            self._closed = True
+            while self._idle:
+                self._close_locked(self._idle.pop())
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self._size_locked(),
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+        checkouts = stats["checkouts"]
+        stats["wait_time_avg"] = stats["wait_time_total"] / checkouts if checkouts else 0.0
+        return stats
+
+    # -- internals -------------------------------------------------
+
+    def _connect(self):
+        return pymysql.connect(**self.connect_kwargs)
+
+    def _size_locked(self):
+        return len(self._idle) + len(self._in_use) + self._pending
+
+    def _is_expired(self, pooled, now):
+        return now - pooled.created_at > self.max_lifetime
+
+    def _is_alive(self, pooled):
+        if time.monotonic() - pooled.last_used < self.ping_interval:
+            return pooled.raw.open
+        try:
+            pooled.raw.ping(reconnect=False)
+            return True
+        except pymysql.MySQLError:
+            return False
+
+    def _evict_idle_locked(self):
+        # the least recently used connections sit at the left end
+        now = time.monotonic()
+        while self._idle and self._size_locked() > self.min_size:
+            oldest = self._idle[0]
+            if now - oldest.last_used <= self.max_idle and not self._is_expired(oldest, now):
+                break
+            self._close_locked(self._idle.popleft())
+
+    def _hand_out_locked(self, pooled, started, waited):
+        waited_for = time.monotonic() - started
+        self._in_use[id(pooled.raw)] = pooled
+        self._stats["checkouts"] += 1
+        if waited:
+            self._stats["waits"] += 1
+        self._stats["wait_time_total"] += waited_for
+        self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited_for)
+        return pooled.raw
+
+    def _close_locked(self, pooled):
+        self._stats["closed"] += 1
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
+        self._refill_locked()
+
+    def _refill_locked(self):
+        # replace retired connections off the request path, so the next
+        # checkout after an eviction does not pay for the handshake
+        if self._closed or self._filling or self._size_locked() >= self.min_size:
+            return
+        self._filling = True
+        threading.Thread(target=self._fill_in_background, name="db-pool-fill", daemon=True).start()
+
+    def _fill_in_background(self):
+        try:
+            self.fill()
+        except Exception as error:
+            logger.warning("could not refill the connection pool: %s", error)
+        finally:
+            with self._lock:
+                self._filling = False
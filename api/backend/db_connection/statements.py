@@ -0,0 +1,86 @@
+#------------------------------------------------------------
+# Statement cache for the shared query executor.
+#
+# PyMySQL has no server-side prepared statements, so what we
+# cache per SQL text is the work we would otherwise redo on
+# every call: the normalised statement we send, whether it
+# returns rows, and running timing stats.
+#------------------------------------------------------------
+import threading
+from collections import OrderedDict
+
+
+_READ_KEYWORDS = ("SELECT", "WITH", "SHOW", "EXPLAIN", "DESCRIBE")
+
+
+class Statement:
+    __slots__ = ("sql", "is_read", "calls", "rows", "total_time", "max_time")
+
+    def __init__(self, sql):
+        # drop the indentation of triple-quoted queries so logs and the
+        # wire carry the statement only
+        self.sql = "\n".join(line.strip() for line in sql.strip().splitlines())
+        self.is_read = self.sql.lstrip("(").upper().startswith(_READ_KEYWORDS)
+        self.calls = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed, rows):
+        self.calls += 1
+        self.rows += rows
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+
+    def as_dict(self):
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_ms": round(self.total_time * 1000, 3),
+            "avg_ms": round(self.total_time * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_time * 1000, 3),
+        }
+
+
+class StatementCache:
+    """LRU map of SQL text -> Statement, bounded to max_size entries."""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._statements = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sql):
+        with self._lock:
+            statement = self._statements.get(sql)
+            if statement is not None:
+                self._statements.move_to_end(sql)
+                self.hits += 1
+                return statement
+
+            self.misses += 1
+            statement = Statement(sql)
+            self._statements[sql] = statement
+            if len(self._statements) > self.max_size:
+                self._statements.popitem(last=False)
+            return statement
+
+    def record(self, statement, elapsed, rows):
+        with self._lock:
+            statement.record(elapsed, rows)
+
+    def stats(self, top=20):
+        with self._lock:
+            statements = [s.as_dict() for s in self._statements.values()]
+            hits, misses = self.hits, self.misses
+        statements.sort(key=lambda s: s["total_ms"], reverse=True)
+        return {
+            "cached": len(statements),
+            "hits": hits,
+            "misses": misses,
+            "statements": statements[:top],
+        }
@@ -1,8 +1,47 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db as db_connection
+from backend.pagination import Keyset, paginated_rows
+from backend.streaming import stream_rows
 
 dietician_bp = Blueprint("dietician", __name__, url_prefix="/dieticians")
 
+SEARCH_ORDER = Keyset(("Relevance", True), ("Source", False), ("Record_ID", False))
+
+SEARCH_MODES = {
+    "natural": "IN NATURAL LANGUAGE MODE",
+    # lets dietitians quote phrases ("late night") and use +/- operators
+    "boolean": "IN BOOLEAN MODE",
+}
+
+# one branch per FULLTEXT index (migration 0005); {client} narrows a
+# branch to one client's rows
+SEARCH_SOURCES = [
+    """
+        SELECT 'meal_note' AS Source, m.Meal_ID AS Record_ID, m.Meal_ID, m.User_ID AS Client_ID,
+               m.Meal_Date AS Entry_Date, m.Notes AS Text,
+               MATCH(m.Notes) AGAINST (%s {mode}) AS Relevance
+        FROM Meals m
+        WHERE MATCH(m.Notes) AGAINST (%s {mode}){client}
+    """,
+    """
+        SELECT 'meal_comment' AS Source, mc.Comment_ID AS Record_ID, mc.Meal_ID, m.User_ID AS Client_ID,
+               mc.Comment_Date AS Entry_Date, mc.Comment_Text AS Text,
+               MATCH(mc.Comment_Text) AGAINST (%s {mode}) AS Relevance
+        FROM Meal_Comments mc
+        JOIN Meals m ON m.Meal_ID = mc.Meal_ID
+        WHERE MATCH(mc.Comment_Text) AGAINST (%s {mode}){client}
+    """,
+    """
+        SELECT 'comment' AS Source, c.comment_id AS Record_ID, c.meal_id AS Meal_ID, ml.user_id AS Client_ID,
+               DATE(c.comment_time) AS Entry_Date, c.comment_text AS Text,
+               MATCH(c.comment_text) AGAINST (%s {mode}) AS Relevance
+        FROM Comments c
+        JOIN MealLogs ml ON ml.meal_id = c.meal_id
+        WHERE MATCH(c.comment_text) AGAINST (%s {mode}){client}
+    """,
+]
+SEARCH_CLIENT_COLUMNS = ["m.User_ID", "m.User_ID", "ml.user_id"]
+
 
 @dietician_bp.route("/", methods=["GET"])
 def get_all_dieticians():
@@ -10,8 +49,8 @@ def get_all_dieticians():
         SELECT dietitian_id, user_id, license_number, specialization
         FROM Dietitians
     """
-    result = db_connection.execute_query(query)
-    return jsonify(result), 200
+    result = db_connection.stream_query(query)
+    return stream_rows(result)
 
 
 @dietician_bp.route("/<int:dietitian_id>", methods=["GET"])
@@ -151,3 +190,34 @@ def delete_dietician(dietitian_id):
     )
 
     return jsonify({"message": "Dietician deleted"}), 200
+
+
+@dietician_bp.route("/search/notes", methods=["GET"])
+def search_notes():
+    """
+    Meal notes, meal comments and dietitian comments matching ?q=, most
+    relevant first, paged with ?limit/?after. ?client_id= limits the
+    search to one client and ?mode=boolean enables phrase and operator
+    syntax. Relevance is scored per index, so it ranks rows well within
+    one source and only roughly across sources.
+    """
+    search = request.args.get("q", "").strip()
+    mode = request.args.get("mode", "natural")
+    client_id = request.args.get("client_id", type=int)
+
+    if not search:
+        return jsonify({"error": "q is required"}), 400
+    if mode not in SEARCH_MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(SEARCH_MODES)}"}), 400
+
+    branches = []
+    params = []
+    for source, client_column in zip(SEARCH_SOURCES, SEARCH_CLIENT_COLUMNS):
+        client = f" AND {client_column} = %s" if client_id is not None else ""
+        branches.append(source.format(mode=SEARCH_MODES[mode], client=client))
+        params.extend([search, search])
+        if client_id is not None:
+            params.append(client_id)
+
+    query = f"SELECT * FROM ({' UNION ALL '.join(branches)}) AS hits WHERE 1 = 1"
+    return paginated_rows(SEARCH_ORDER, query, params, always_page=True)
@@ -0,0 +1,76 @@
+#------------------------------------------------------------
+# Largest-Triangle-Three-Buckets downsampling for time series.
+#
+# LTTB keeps the first and last points and, from each of
+# N - 2 equal-width buckets in between, the point that forms
+# the largest triangle with the point kept from the previous
+# bucket and the average of the next bucket. The chart keeps
+# its peaks and dips with a fixed number of points.
+#------------------------------------------------------------
+from datetime import date, datetime
+
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Return the indices of the points LTTB keeps from the series (x, y),
+    which must be sorted by x. Short series come back whole.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # bucket i (0-based, of threshold - 2) covers [edges[i], edges[i + 1]);
+    # the first and last points sit outside every bucket
+    edges = np.arange(threshold - 1) * (n - 2) // (threshold - 2) + 1
+
+    # mean x/y of every bucket at once from running sums; the "next
+    # bucket" of the last bucket is the final point itself
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    next_start = np.append(edges[1:-1], n - 1)
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    next_x = (x_sums[next_end] - x_sums[next_start]) / counts
+    next_y = (y_sums[next_end] - y_sums[next_start]) / counts
+
+    keep = np.empty(threshold, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        px, py = x[previous], y[previous]
+        # twice the triangle area for every candidate in the bucket
+        areas = np.abs(
+            (px - next_x[bucket]) * (y[start:end] - py)
+            - (px - x[start:end]) * (next_y[bucket] - py)
+        )
+        previous = start + int(np.argmax(areas))
+        keep[bucket + 1] = previous
+    return keep
+
+
+def _timestamp(value):
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).timestamp()
+    return float(value)
+
+
+def downsample_rows(rows, x_key, y_key, points):
+    """
+    Downsample a list of row dicts ordered by `x_key` (a date, datetime
+    or number) to at most `points` rows with LTTB on `y_key`. Rows with
+    no y value are dropped.
+    """
+    rows = [row for row in rows if row[y_key] is not None and row[x_key] is not None]
+    if len(rows) <= points:
+        return rows
+    x = [_timestamp(row[x_key]) for row in rows]
+    y = [float(row[y_key]) for row in rows]
+    return [rows[index] for index in lttb_indices(x, y, points)]
@@ -0,0 +1,21 @@
+#------------------------------------------------------------
+# Query-string filters shared by list and analytics endpoints
+#------------------------------------------------------------
+from flask import request
+
+
+def date_range(query, params, column):
+    """
+    Extend a query that already has a WHERE clause with the request's
+    ?start_date= / ?end_date= bounds (inclusive) on `column`.
+    """
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+    
+    if start_date:
+        query += f" AND {column} >= %s"
+        params.append(start_date)
+    if end_date:
+        query += f" AND {column} <= %s"
+        params.append(end_date)
+    return query, params
@@ -0,0 +1,234 @@
+#------------------------------------------------------------
+# Fuzzy search over Foods.name for the meal logging page.
+#
+# Two in-process indexes over the cached Foods catalog:
+#
+# - prefix tries over the words of every name and over the
+#   whole name, so "chi br" finds "Chicken Breast" while the
+#   user is still typing
+# - a trigram inverted index, so misspellings such as
+#   "brocoli" still find "Broccoli" by trigram overlap
+#
+# Every food gets a slot number; trie nodes and trigram
+# postings hold slots, and a query is scored for all slots at
+# once with NumPy: trigram overlap by np.bincount over the
+# query's postings, Jaccard similarity against each name's
+# trigram count, plus a bonus when every query word prefixes
+# a word of the name and another when the name starts with
+# the query. Trigram-only matches need MIN_SIMILARITY.
+#
+# The index follows nutrition.catalog: when the catalog
+# reloads after a Foods write, only foods that were added,
+# renamed or removed are re-indexed.
+#------------------------------------------------------------
+import re
+import threading
+
+import numpy as np
+
+from backend.nutrition import catalog
+
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+# trigram-only matches below this similarity are dropped
+MIN_SIMILARITY = 0.25
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(text):
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def _trigrams(key):
+    """Trigrams of a normalized name, padded so short words still have some."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Postings:
+    """A set of slots, with a NumPy copy rebuilt only after it changes."""
+    __slots__ = ("slots", "_array")
+
+    def __init__(self):
+        self.slots = set()
+        self._array = None
+
+    def add(self, slot):
+        self.slots.add(slot)
+        self._array = None
+
+    def discard(self, slot):
+        self.slots.discard(slot)
+        self._array = None
+
+    def array(self):
+        if self._array is None:
+            self._array = np.fromiter(self.slots, dtype=np.int64, count=len(self.slots))
+        return self._array
+
+
+class _Trie:
+    def __init__(self):
+        self.root = {}
+
+    def add(self, word, slot):
+        node = self.root
+        for char in word:
+            child = node.get(char)
+            if child is None:
+                child = node[char] = ({}, _Postings())
+            child[1].add(slot)
+            node = child[0]
+
+    def discard(self, word, slot):
+        node = self.root
+        for char in word:
+            child = node.get(char)
+            if child is None:
+                # already pruned by another word of the same name
+                return
+            child[1].discard(slot)
+            if not child[1].slots:
+                # nothing else below this prefix
+                del node[char]
+                return
+            node = child[0]
+
+    def find(self, prefix):
+        """Postings of every slot with a word starting with prefix, or None."""
+        node, postings = self.root, None
+        for char in prefix:
+            child = node.get(char)
+            if child is None:
+                return None
+            node, postings = child
+        return postings
+
+
+class FoodSearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._words = _Trie()
+        self._names = _Trie()
+        self._grams = {}
+        self._slot_of = {}
+        self._names_of = {}
+        self._food_of = []
+        self._keys = []
+        self._free = []
+        self._gram_counts = np.zeros(0, dtype=np.int64)
+        self._table = None
+
+    def add(self, food_id, name):
+        self.remove(food_id)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._food_of)
+            self._food_of.append(None)
+            self._keys.append(None)
+            if slot >= len(self._gram_counts):
+                self._gram_counts = np.resize(self._gram_counts, max(64, 2 * slot))
+        key = _normalize(name)
+        grams = _trigrams(key)
+        self._slot_of[food_id] = slot
+        self._names_of[food_id] = name
+        self._food_of[slot] = food_id
+        self._keys[slot] = key
+        self._gram_counts[slot] = len(grams)
+
+        for word in set(key.split()):
+            self._words.add(word, slot)
+        self._names.add(key, slot)
+        for gram in grams:
+            postings = self._grams.get(gram)
+            if postings is None:
+                postings = self._grams[gram] = _Postings()
+            postings.add(slot)
+
+    def remove(self, food_id):
+        slot = self._slot_of.pop(food_id, None)
+        if slot is None:
+            return
+        del self._names_of[food_id]
+        key = self._keys[slot]
+        for word in set(key.split()):
+            self._words.discard(word, slot)
+        self._names.discard(key, slot)
+        for gram in _trigrams(key):
+            postings = self._grams[gram]
+            postings.discard(slot)
+            if not postings.slots:
+                del self._grams[gram]
+        self._food_of[slot] = None
+        self._keys[slot] = None
+        self._gram_counts[slot] = 0
+        self._free.append(slot)
+
+    def sync(self, table):
+        """Bring the index in line with a FoodTable, touching only changed foods."""
+        names = dict(zip(table.ids.tolist(), table.names))
+        for food_id in self._slot_of.keys() - names.keys():
+            self.remove(food_id)
+        for food_id, name in names.items():
+            if self._names_of.get(food_id) != name:
+                self.add(food_id, name)
+        self._table = table
+
+    def search(self, query, limit=SEARCH_DEFAULT_LIMIT):
+        """Food ids matching the query with their scores, best first."""
+        key = _normalize(query)
+        if not key:
+            return []
+        slots = len(self._food_of)
+
+        query_grams = _trigrams(key)
+        postings = [self._grams[gram].array() for gram in query_grams if gram in self._grams]
+        if postings:
+            overlaps = np.bincount(np.concatenate(postings), minlength=slots)
+        else:
+            overlaps = np.zeros(slots, dtype=np.int64)
+        scores = overlaps / (len(query_grams) + self._gram_counts[:slots] - overlaps)
+        matched = scores >= MIN_SIMILARITY
+
+        # every query word must prefix some word of the name
+        prefixed = np.ones(slots, dtype=bool)
+        for word in key.split():
+            found = self._words.find(word)
+            hits = np.zeros(slots, dtype=bool)
+            if found is not None:
+                hits[found.array()] = True
+            prefixed &= hits
+        scores[prefixed] += 1.0
+        starts = self._names.find(key)
+        if starts is not None:
+            scores[starts.array()] += 1.0
+
+        candidates = np.flatnonzero(matched | prefixed)
+        if len(candidates) > limit:
+            best = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[best]
+        ranked = sorted(
+            candidates.tolist(),
+            key=lambda slot: (-scores[slot], len(self._keys[slot]), self._keys[slot])
+        )
+        return [(self._food_of[slot], float(scores[slot])) for slot in ranked]
+
+    def lookup(self, query, limit=SEARCH_DEFAULT_LIMIT):
+        """Foods matching the query as dicts with a score, best first."""
+        table = catalog.table()
+        with self._lock:
+            if table is not self._table:
+                self.sync(table)
+            matches = self.search(query, limit)
+        results = []
+        for food_id, score in matches:
+            food = table.row(food_id)
+            food["score"] = round(score, 3)
+            results.append(food)
+        return results
+
+
+index = FoodSearchIndex()
@@ -0,0 +1,104 @@
+from flask import Blueprint, jsonify, request
+from backend.db_connection import db as db_connection
+from backend.food_search import SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, index
+from backend.nutrition import catalog
+
+foods = Blueprint("foods", __name__)
+
+FOOD_FIELDS = ["name", "kcal_per_unit", "protein_g", "carbs_g", "fat_g", "unit"]
+
+
+@foods.route("/search", methods=["GET"])
+def search_foods():
+    query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", SEARCH_DEFAULT_LIMIT, type=int)
+    error = None
+    
+    if not query:
+        error = "q is required"
+    elif limit < 1 or limit > SEARCH_MAX_LIMIT:
+        error = f"limit must be between 1 and {SEARCH_MAX_LIMIT}"
+    
+    if error is None:
+        return jsonify(index.lookup(query, limit)), 200
+    
+    return jsonify({"error": error}), 400
+
+
+@foods.route("/<int:food_id>", methods=["GET"])
+def get_food(food_id):
+    food = catalog.get(food_id)
+    
+    error = None
+    if food is None:
+        error = "Food not found"
+    
+    if error is None:
+        return jsonify(food), 200
+    
+    return jsonify({"error": error}), 404
+
+
+@foods.route("", methods=["POST"])
+def create_food():
+    data = request.get_json()
+    error = None
+    
+    if not data:
+        error = "Request body is required"
+    elif "name" not in data:
+        error = "name is required"
+    elif "kcal_per_unit" not in data:
+        error = "kcal_per_unit is required"
+    elif "unit" not in data:
+        error = "unit is required"
+    
+    if error is None:
+        food_id = db_connection.insert_query(
+            "INSERT INTO Foods (name, kcal_per_unit, protein_g, carbs_g, fat_g, unit) VALUES (%s, %s, %s, %s, %s, %s)",
+            (data["name"], data["kcal_per_unit"], data.get("protein_g"), data.get("carbs_g"), data.get("fat_g"), data["unit"])
+        )
+        catalog.invalidate()
+        return jsonify({"message": "Food created successfully", "food_id": food_id}), 201
+    
+    return jsonify({"error": error}), 400
+
+
+@foods.route("/<int:food_id>", methods=["PUT"])
+def update_food(food_id):
+    data = request.get_json()
+    error = None
+    
+    food = db_connection.fetch_one("SELECT * FROM Foods WHERE food_id = %s", (food_id,))
+    
+    if food is None:
+        error = "Food not found"
+    elif not data:
+        error = "Request body is required"
+    
+    if error is None:
+        update_fields = []
+        params = []
+        
+        for field in FOOD_FIELDS:
+            if field in data:
+                update_fields.append(f"{field} = %s")
+                params.append(data[field])
+        
+        if not update_fields:
+            error = "No valid fields to update"
+    
+    if error is None:
+        params.append(food_id)
+        db_connection.update_query(f"UPDATE Foods SET {', '.join(update_fields)} WHERE food_id = %s", tuple(params))
+        catalog.invalidate()
+        return jsonify({"message": "Food updated successfully"}), 200
+    
+    if error == "Food not found":
+        return jsonify({"error": error}), 404
+    return jsonify({"error": error}), 400
+
+
+@foods.route("/catalog/stats", methods=["GET"])
+def get_catalog_stats():
+    return jsonify(catalog.stats()), 200
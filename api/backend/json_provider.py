@@ -0,0 +1,40 @@
+#------------------------------------------------------------
+# Flask JSON provider backed by orjson.
+#
+# orjson encodes dicts, dates and datetimes in C. The two
+# types MySQL rows carry that it does not know about - TIME
+# columns (timedelta) and DECIMAL columns - go through
+# _default, so rows can be handed to jsonify() as they come
+# off the cursor.
+#------------------------------------------------------------
+from datetime import timedelta
+import decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+
+def _default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, timedelta):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+
+    def dumps_bytes(self, obj):
+        """Like dumps() but skips decoding, for writing straight to a response."""
+        return orjson.dumps(obj, default=_default, option=self.option)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype="application/json")
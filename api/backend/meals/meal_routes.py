@@ -1,46 +1,30 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db as db_connection
-from datetime import datetime, date, time, timedelta
-import decimal
-
-def get_db():
-    return db_connection.get_db().cursor()
-
-def serialize_row(row):
-    """Convert database row to JSON-serializable dict"""
-    if row is None:
-        return None
-    result = {}
-    for key, value in row.items():
-        if isinstance(value, (datetime, date)):
-            result[key] = value.isoformat() if value else None
-        elif isinstance(value, time):
-            result[key] = str(value) if value else None
-        elif isinstance(value, timedelta):
-            result[key] = str(value) if value else None
-        elif isinstance(value, decimal.Decimal):
-            result[key] = float(value) if value is not None else None
-        else:
-            result[key] = value
-    return result
+from backend import nutrition, summaries
+from backend.response_cache import responses
+from backend.streaming import stream_rows
 
 meals = Blueprint("meals", __name__)
 
 
+def _read_meal(cursor, meal_id, lock=False):
+    cursor.execute(
+        "SELECT * FROM Meals WHERE Meal_ID = %s" + (" FOR UPDATE" if lock else ""),
+        (meal_id,)
+    )
+    return cursor.fetchone()
+
+
 @meals.route("/<int:meal_id>", methods=["GET"])
 def get_meal(meal_id):
-    db = get_db()
-    db.execute("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
-    meal = db.fetchone()
-    db.close()
+    meal = db_connection.fetch_one("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
     
     error = None
     if meal is None:
         error = "Meal not found"
     
     if error is None:
-        serialized_meal = serialize_row(meal)
-        return jsonify(serialized_meal), 200
+        return jsonify(meal), 200
     
     return jsonify({"error": error}), 404
 
@@ -60,14 +44,15 @@ def create_meal():
         error = "Calories is required"
     
     if error is None:
-        db = get_db()
-        db.execute(
-            "INSERT INTO Meals (User_ID, Meal_Name, Calories, Meal_Date, Meal_Time) VALUES (%s, %s, %s, %s, %s)",
-            (data["User_ID"], data["Meal_Name"], data["Calories"], data.get("Meal_Date"), data.get("Meal_Time"))
-        )
-        db_connection.get_db().commit()
-        meal_id = db.lastrowid
-        db.close()
+        # the summary row moves in the same transaction as the meal
+        with db_connection.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO Meals (User_ID, Meal_Name, Calories, Meal_Date, Meal_Time) VALUES (%s, %s, %s, %s, %s)",
+                (data["User_ID"], data["Meal_Name"], data["Calories"], data.get("Meal_Date"), data.get("Meal_Time"))
+            )
+            meal_id = cursor.lastrowid
+            summaries.meal_changed(cursor, None, _read_meal(cursor, meal_id))
+        responses.invalidate(data["User_ID"])
         return jsonify({"message": "Meal created successfully", "meal_id": meal_id}), 201
     
     return jsonify({"error": error}), 400
@@ -78,9 +63,7 @@ def update_meal(meal_id):
     data = request.get_json()
     error = None
     
-    db = get_db()
-    db.execute("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
-    meal = db.fetchone()
+    meal = db_connection.fetch_one("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
     
     if meal is None:
         error = "Meal not found"
@@ -102,12 +85,13 @@ def update_meal(meal_id):
     
     if error is None:
         params.append(meal_id)
-        db.execute(f"UPDATE Meals SET {', '.join(update_fields)} WHERE Meal_ID = %s", tuple(params))
-        db_connection.get_db().commit()
-        db.close()
+        with db_connection.transaction() as cursor:
+            before = _read_meal(cursor, meal_id, lock=True)
+            cursor.execute(f"UPDATE Meals SET {', '.join(update_fields)} WHERE Meal_ID = %s", tuple(params))
+            summaries.meal_changed(cursor, before, _read_meal(cursor, meal_id))
+        responses.invalidate(meal["User_ID"])
         return jsonify({"message": "Meal updated successfully"}), 200
     
-    db.close()
     if error == "Meal not found":
         return jsonify({"error": error}), 404
     return jsonify({"error": error}), 400
@@ -115,41 +99,35 @@ def update_meal(meal_id):
 
 @meals.route("/<int:meal_id>", methods=["DELETE"])
 def delete_meal(meal_id):
-    db = get_db()
-    db.execute("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
-    meal = db.fetchone()
+    meal = db_connection.fetch_one("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
     
     error = None
     if meal is None:
         error = "Meal not found"
     
     if error is None:
-        db.execute("DELETE FROM Meals WHERE Meal_ID = %s", (meal_id,))
-        db_connection.get_db().commit()
-        db.close()
+        with db_connection.transaction() as cursor:
+            before = _read_meal(cursor, meal_id, lock=True)
+            cursor.execute("DELETE FROM Meals WHERE Meal_ID = %s", (meal_id,))
+            summaries.meal_changed(cursor, before, None)
+        responses.invalidate(meal["User_ID"])
         return jsonify({"message": "Meal deleted successfully"}), 200
     
-    db.close()
     return jsonify({"error": error}), 404
 
 
 @meals.route("/<int:meal_id>/comments", methods=["GET"])
 def get_meal_comments(meal_id):
-    db = get_db()
-    db.execute("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
-    meal = db.fetchone()
+    meal = db_connection.fetch_one("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
     
     error = None
     if meal is None:
         error = "Meal not found"
     
     if error is None:
-        db.execute("SELECT * FROM Meal_Comments WHERE Meal_ID = %s", (meal_id,))
-        comments = db.fetchall()
-        db.close()
-        return jsonify(comments), 200
+        comments = db_connection.stream_query("SELECT * FROM Meal_Comments WHERE Meal_ID = %s", (meal_id,))
+        return stream_rows(comments)
     
-    db.close()
     return jsonify({"error": error}), 404
 
 
@@ -166,24 +144,57 @@ def create_meal_comment(meal_id):
         error = "Comment_Text is required"
     
     if error is None:
-        db = get_db()
-        db.execute("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
-        meal = db.fetchone()
+        meal = db_connection.fetch_one("SELECT * FROM Meals WHERE Meal_ID = %s", (meal_id,))
         
         if meal is None:
             error = "Meal not found"
     
     if error is None:
-        db.execute(
+        comment_id = db_connection.insert_query(
             "INSERT INTO Meal_Comments (Meal_ID, Dietitian_ID, Comment_Text, Comment_Date) VALUES (%s, %s, %s, %s)",
             (meal_id, data["Dietitian_ID"], data["Comment_Text"], data.get("Comment_Date"))
         )
-        db_connection.get_db().commit()
-        comment_id = db.lastrowid
-        db.close()
         return jsonify({"message": "Comment added successfully", "comment_id": comment_id}), 201
     
     if error == "Meal not found":
         return jsonify({"error": error}), 404
     return jsonify({"error": error}), 400
 
+
+
+@meals.route("/logs/<int:meal_id>/nutrients", methods=["GET"])
+def get_meal_log_nutrients(meal_id):
+    nutrients = db_connection.fetch_one("SELECT * FROM Nutrients WHERE meal_id = %s", (meal_id,))
+    
+    error = None
+    if nutrients is None:
+        error = "Nutrients not found"
+    
+    if error is None:
+        return jsonify(nutrients), 200
+    
+    return jsonify({"error": error}), 404
+
+
+@meals.route("/logs/<int:meal_id>/nutrients", methods=["POST"])
+def refresh_meal_log_nutrients(meal_id):
+    error = None
+    
+    with db_connection.transaction() as cursor:
+        cursor.execute("SELECT meal_id FROM MealLogs WHERE meal_id = %s FOR UPDATE", (meal_id,))
+        if cursor.fetchone() is None:
+            error = "Meal log not found"
+        else:
+            try:
+                nutrition.refresh_meals([meal_id], cursor)
+            except KeyError as e:
+                error = e.args[0]
+            cursor.execute("SELECT * FROM Nutrients WHERE meal_id = %s", (meal_id,))
+            nutrients = cursor.fetchone()
+    
+    if error is None:
+        return jsonify(nutrients), 200
+    
+    if error == "Meal log not found":
+        return jsonify({"error": error}), 404
+    return jsonify({"error": error}), 400
@@ -0,0 +1,37 @@
+-- -----------------------------------------------------
+-- Composite indexes for the listing endpoints.
+--
+-- Each index leads with the equality column and continues with
+-- the ORDER BY columns, so MySQL reads one index range in
+-- order (backwards for DESC) and stops at the LIMIT instead of
+-- sorting every row the filter matched. InnoDB appends the
+-- primary key to every secondary index, which covers the
+-- final tie-breaker column of the keyset cursors.
+--
+-- An index that starts with a foreign key column also takes
+-- over from the single-column index MySQL created for that
+-- key, which it then drops.
+-- -----------------------------------------------------
+
+-- /clients/<id>/meals, /nutrition, meals.arrow:
+--   WHERE User_ID = ? [AND Meal_Date BETWEEN ..] ORDER BY Meal_Date DESC, Meal_Time DESC, Meal_ID DESC
+-- /clients/meals.parquet: ORDER BY User_ID, Meal_Date, Meal_ID
+CREATE INDEX idx_meals_user_date ON Meals (User_ID, Meal_Date, Meal_Time);
+
+-- /clients/<id>/workouts, workouts.arrow, /clients/workouts.parquet
+CREATE INDEX idx_workouts_user_date ON Workouts (User_ID, Workout_Date);
+
+-- /clients/goals?user_id=: WHERE user_id = ? ORDER BY start_time DESC, goal_id DESC
+CREATE INDEX idx_goals_user_start ON Goals (user_id, start_time);
+
+-- /clients/goals: ORDER BY start_time DESC, goal_id DESC LIMIT n
+CREATE INDEX idx_goals_start ON Goals (start_time);
+
+-- coach notification feed: WHERE coach_id = ? AND notif_type = ? ORDER BY sent_date DESC
+CREATE INDEX idx_notifications_coach_type_sent ON Notifications (coach_id, notif_type, sent_date);
+
+-- /admin/audit: change_date range, ORDER BY change_date DESC, log_id DESC
+CREATE INDEX idx_auditlog_change_date ON AuditLog (change_date);
+
+-- weight history: WHERE user_id = ? ORDER BY date_time
+CREATE INDEX idx_metriclogs_user_time ON MetricLogs (user_id, date_time);
@@ -0,0 +1,18 @@
+-- -----------------------------------------------------
+-- DailyUserSummary: one row per user per day with activity,
+-- kept current by the meal and workout handlers (see
+-- backend/summaries.py). After applying this migration run
+--   python -m backend.summaries
+-- once to backfill it from the existing Meals and Workouts.
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS DailyUserSummary (
+    user_id INT NOT NULL,
+    summary_date DATE NOT NULL,
+    calories_in INT NOT NULL DEFAULT 0,
+    meal_count INT NOT NULL DEFAULT 0,
+    calories_burned INT NOT NULL DEFAULT 0,
+    workout_count INT NOT NULL DEFAULT 0,
+    workout_minutes INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, summary_date),
+    FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
+);
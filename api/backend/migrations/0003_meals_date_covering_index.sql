@@ -0,0 +1,9 @@
+-- -----------------------------------------------------
+-- Covering index for the fleet-wide meal analytics.
+--
+-- /analytics/nutrition/daily and /analytics/clients/compare
+-- filter every client's meals by Meal_Date and only read
+-- User_ID and Calories, so both run as a range scan over this
+-- index without touching the table rows.
+-- -----------------------------------------------------
+CREATE INDEX idx_meals_date_user_calories ON Meals (Meal_Date, User_ID, Calories);
@@ -0,0 +1,36 @@
+-- -----------------------------------------------------
+-- Rollup cubes for long-range trend charts (backend/rollups.py).
+--
+-- Each cube holds one row per (grain, period, user, dimension)
+-- at three grains: day, week (starting Monday) and month.
+-- Watermarks records the highest source row id each
+-- incremental job has already folded in.
+-- -----------------------------------------------------
+CREATE TABLE IF NOT EXISTS Watermarks (
+    name VARCHAR(64) PRIMARY KEY,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS WorkoutRollups (
+    grain ENUM('day', 'week', 'month') NOT NULL,
+    period_start DATE NOT NULL,
+    user_id INT NOT NULL,
+    workout_type VARCHAR(100) NOT NULL DEFAULT '',
+    workouts INT NOT NULL DEFAULT 0,
+    minutes INT NOT NULL DEFAULT 0,
+    calories_burned INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (grain, period_start, user_id, workout_type),
+    KEY idx_workoutrollups_user (grain, user_id, period_start)
+);
+
+CREATE TABLE IF NOT EXISTS MealRollups (
+    grain ENUM('day', 'week', 'month') NOT NULL,
+    period_start DATE NOT NULL,
+    user_id INT NOT NULL,
+    meal_bucket VARCHAR(20) NOT NULL,
+    meals INT NOT NULL DEFAULT 0,
+    calories INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (grain, period_start, user_id, meal_bucket),
+    KEY idx_mealrollups_user (grain, user_id, period_start)
+);
@@ -0,0 +1,11 @@
+-- -----------------------------------------------------
+-- FULLTEXT indexes for the dietitian notes search
+-- (/dieticians/search/notes), so a search for "bloating" or
+-- "late night" is an index lookup instead of a
+-- LIKE '%...%' scan of every meal note and comment.
+-- -----------------------------------------------------
+CREATE FULLTEXT INDEX ft_meals_notes ON Meals (Notes);
+
+CREATE FULLTEXT INDEX ft_meal_comments_text ON Meal_Comments (Comment_Text);
+
+CREATE FULLTEXT INDEX ft_comments_text ON Comments (comment_text);
@@ -0,0 +1,14 @@
+-- -----------------------------------------------------
+-- Missed-workout notifications (backend/missed_workouts.py).
+--
+-- about_date is the day a notification refers to. The unique
+-- key allows one missed_workout notification per coach, client
+-- and day, so the detector can re-scan a day without sending
+-- it twice; rows with no about_date are not constrained.
+-- -----------------------------------------------------
+ALTER TABLE Notifications ADD COLUMN about_date DATE NULL;
+
+CREATE UNIQUE INDEX uq_notifications_about ON Notifications (coach_id, client_id, notif_type, about_date);
+
+-- the detector's "did the client log anything that day" lookup
+CREATE INDEX idx_workoutlogs_client_date ON WorkoutLogs (client_id, log_date);
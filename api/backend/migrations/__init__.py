@@ -0,0 +1,152 @@
+#------------------------------------------------------------
+# Versioned schema migrations.
+#
+# database-files/00_fitness_db.sql only runs when the db
+# container is first created, and it rebuilds every table with
+# DROP TABLE IF EXISTS. Additive changes (indexes, new tables)
+# live here instead as numbered files, NNNN_description.sql,
+# and are applied in order to an existing database. Applied
+# versions are recorded in the schema_migrations table so each
+# file runs exactly once.
+#
+#   python -m backend.migrations            apply pending files
+#   python -m backend.migrations --list     show what is applied
+#   python -m backend.migrations --explain  EXPLAIN the hot queries
+#------------------------------------------------------------
+import logging
+import os
+import re
+
+from pymysql.constants import ER
+from pymysql.err import OperationalError
+
+from backend.db_connection import db as db_connection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+_FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def statements(self):
+        """The file's statements, split on ';' at the end of a line."""
+        with open(self.path) as sql_file:
+            lines = [
+                line for line in sql_file.read().splitlines()
+                if not line.lstrip().startswith("--")
+            ]
+        statements = re.split(r";\s*$", "\n".join(lines), flags=re.MULTILINE)
+        return [statement.strip() for statement in statements if statement.strip()]
+
+
+def available():
+    """Every migration file, in version order."""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(
+                Migration(int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename))
+            )
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+
+def applied_versions():
+    db_connection.execute_query(CREATE_MIGRATIONS_TABLE, commit=True)
+    rows = db_connection.execute_query("SELECT version FROM schema_migrations")
+    return {row["version"] for row in rows}
+
+
+def pending():
+    done = applied_versions()
+    return [migration for migration in available() if migration.version not in done]
+
+
+def _execute(statement):
+    try:
+        db_connection.execute_query(statement, commit=True)
+    except OperationalError as error:
+        # MySQL has no CREATE INDEX / ADD COLUMN IF NOT EXISTS; an index
+        # or column left behind by a half-applied file is fine to keep
+        if error.args[0] not in (ER.DUP_KEYNAME, ER.DUP_FIELDNAME):
+            raise
+        logger.info("skipping, already exists: %s", error.args[1])
+
+
+def migrate():
+    """Apply every pending migration and return the ones applied."""
+    applied = []
+    for migration in pending():
+        logger.info("applying migration %04d_%s", migration.version, migration.name)
+        # DDL commits implicitly in MySQL, so a file is recorded only
+        # once all of its statements have gone through
+        for statement in migration.statements():
+            _execute(statement)
+        db_connection.execute_query(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            (migration.version, migration.name),
+            commit=True,
+        )
+        applied.append(migration)
+    return applied
+
+
+# The listing queries the blueprints run most, with sample parameters.
+# EXPLAIN should show each one using an index and no "Using filesort".
+HOT_QUERIES = [
+    ("client meals",
+     "SELECT * FROM Meals WHERE User_ID = %s ORDER BY Meal_Date DESC, Meal_Time DESC, Meal_ID DESC LIMIT 51",
+     (121,)),
+    ("client nutrition by date",
+     "SELECT * FROM Meals WHERE User_ID = %s AND Meal_Date >= %s AND Meal_Date <= %s "
+     "ORDER BY Meal_Date DESC, Meal_Time DESC, Meal_ID DESC",
+     (121, "2024-01-01", "2024-12-31")),
+    ("client workouts",
+     "SELECT * FROM Workouts WHERE User_ID = %s ORDER BY Workout_Date DESC, Workout_ID DESC LIMIT 51",
+     (121,)),
+    ("client goals",
+     "SELECT * FROM Goals WHERE user_id = %s ORDER BY start_time DESC, goal_id DESC",
+     (121,)),
+    ("all goals",
+     "SELECT * FROM Goals ORDER BY start_time DESC, goal_id DESC LIMIT 51",
+     ()),
+    ("coach notifications",
+     "SELECT * FROM Notifications WHERE coach_id = %s AND notif_type = %s ORDER BY sent_date DESC",
+     (1, "missed_workout")),
+    ("audit log by date",
+     "SELECT * FROM AuditLog WHERE change_date >= %s AND change_date <= %s "
+     "ORDER BY change_date DESC, log_id DESC LIMIT 51",
+     ("2024-01-01", "2024-12-31")),
+    ("fleet daily nutrition",
+     "SELECT Meal_Date, COUNT(*), COUNT(DISTINCT User_ID), SUM(Calories) FROM Meals "
+     "WHERE Meal_Date IS NOT NULL AND Meal_Date >= %s GROUP BY Meal_Date ORDER BY Meal_Date",
+     ("2024-01-01",)),
+    ("client comparison",
+     "SELECT User_ID, COUNT(*) AS Total_Meals, COUNT(DISTINCT Meal_Date), SUM(Calories) FROM Meals "
+     "WHERE Meal_Date IS NOT NULL AND Meal_Date >= %s GROUP BY User_ID ORDER BY Total_Meals DESC LIMIT 10",
+     ("2024-01-01",)),
+    ("weight history",
+     "SELECT * FROM MetricLogs WHERE user_id = %s ORDER BY date_time",
+     (121,)),
+]
+
+
+def explain():
+    """Yield (label, EXPLAIN rows) for each of HOT_QUERIES."""
+    for label, query, params in HOT_QUERIES:
+        yield label, db_connection.execute_query("EXPLAIN " + query, params)
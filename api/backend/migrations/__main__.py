@@ -0,0 +1,35 @@
+import argparse
+
+from backend.rest_entry import create_app
+from backend import migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.migrations")
+    parser.add_argument("--list", action="store_true", help="show applied and pending migrations")
+    parser.add_argument("--explain", action="store_true", help="EXPLAIN the hot listing queries")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.list:
+            done = migrations.applied_versions()
+            for migration in migrations.available():
+                state = "applied" if migration.version in done else "pending"
+                print(f"{migration.version:04d}_{migration.name}  {state}")
+        elif args.explain:
+            for label, plan in migrations.explain():
+                print(label)
+                for step in plan:
+                    print(f"  {step['table']}: type={step['type']} key={step['key']} "
+                          f"rows={step['rows']} extra={step['Extra']}")
+        else:
+            applied = migrations.migrate()
+            for migration in applied:
+                print(f"applied {migration.version:04d}_{migration.name}")
+            if not applied:
+                print("database is up to date")
+
+
+if __name__ == "__main__":
+    main()
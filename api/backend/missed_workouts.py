@@ -0,0 +1,132 @@
+#------------------------------------------------------------
+# Missed-workout detector: writes missed_workout Notifications.
+#
+# A client has a workout scheduled on a day when one of their
+# WorkoutPlans (created on or before that day) has a
+# PlanExercises row for that weekday. The day counts as missed
+# when the client has neither a WorkoutLogs row nor a Workouts
+# row dated that day. One statement finds every missed
+# (coach, client, day) for a range of days, and the results
+# are inserted with a single executemany().
+#
+# The last day checked is kept in the Watermarks table, so each
+# run scans only the days finished since the previous run (up
+# to yesterday). Schedule it once a day:
+#
+#   python -m backend.missed_workouts
+#
+# Days that were already notified are skipped by the scan, and
+# Notifications has a unique key on (coach, client, type,
+# about_date) as a backstop, so re-scanning a day never sends
+# it twice and the counts returned are of rows written.
+#------------------------------------------------------------
+import argparse
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from backend.db_connection import db as db_connection
+
+WATERMARK = "missed_workouts"
+NOTIF_TYPE = "missed_workout"
+
+# days checked on the first run
+FIRST_RUN_DAYS = 7
+# the day range is built with a recursive CTE; stay well under
+# MySQL's default cte_max_recursion_depth of 1000
+MAX_SCAN_DAYS = 366
+
+_MISSED = """
+    WITH RECURSIVE days AS (
+        SELECT CAST(%s AS DATE) AS day
+        UNION ALL
+        SELECT day + INTERVAL 1 DAY FROM days WHERE day < %s
+    )
+    SELECT wp.coach_id, wp.client_id, d.day,
+           GROUP_CONCAT(DISTINCT wp.plan_name ORDER BY wp.plan_name SEPARATOR ', ') AS plans
+    FROM days d
+    JOIN PlanExercises pe ON pe.day_of_week = DAYNAME(d.day)
+    JOIN WorkoutPlans wp ON wp.plan_id = pe.plan_id AND DATE(wp.created_at) <= d.day
+    JOIN Clients c ON c.client_id = wp.client_id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM WorkoutLogs wl WHERE wl.client_id = wp.client_id AND wl.log_date = d.day
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM Workouts w WHERE w.User_ID = c.user_id AND w.Workout_Date = d.day
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM Notifications n
+        WHERE n.coach_id = wp.coach_id AND n.client_id = wp.client_id
+          AND n.notif_type = %s AND n.about_date = d.day
+    )
+    GROUP BY wp.coach_id, wp.client_id, d.day
+    ORDER BY wp.coach_id, wp.client_id, d.day
+"""
+
+# executemany() folds these into multi-row INSERTs; IGNORE is a backstop
+# for (coach, client, day) notifications that already exist
+_INSERT = (
+    "INSERT IGNORE INTO Notifications (coach_id, client_id, sent_date, notif_type, about_date, body_text) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+
+
+def _body(day, plans):
+    return f"Missed a scheduled workout on {day:%A %Y-%m-%d} ({plans})"
+
+
+def detect(until=None, since=None):
+    """
+    Write notifications for the days after the watermark up to `until`
+    (default yesterday), or from `since` when given, and move the
+    watermark. Returns {coach_id: notifications written}.
+    """
+    until = until or date.today() - timedelta(days=1)
+
+    with db_connection.transaction() as cursor:
+        # Watermarks.last_id holds the last day checked, as date.toordinal()
+        cursor.execute("INSERT IGNORE INTO Watermarks (name, last_id) VALUES (%s, 0)", (WATERMARK,))
+        # the row lock keeps two runs from scanning the same days
+        cursor.execute("SELECT last_id FROM Watermarks WHERE name = %s FOR UPDATE", (WATERMARK,))
+        checked = cursor.fetchone()["last_id"]
+
+        if since is None:
+            if checked:
+                since = date.fromordinal(checked) + timedelta(days=1)
+            else:
+                since = until - timedelta(days=FIRST_RUN_DAYS - 1)
+        since = max(since, until - timedelta(days=MAX_SCAN_DAYS - 1))
+        if since > until:
+            return {}
+
+        cursor.execute(_MISSED, (since, until, NOTIF_TYPE))
+        missed = cursor.fetchall()
+
+        sent = datetime.now().replace(microsecond=0)
+        cursor.executemany(_INSERT, [
+            (row["coach_id"], row["client_id"], sent, NOTIF_TYPE, row["day"], _body(row["day"], row["plans"]))
+            for row in missed
+        ])
+        cursor.execute(
+            "UPDATE Watermarks SET last_id = GREATEST(last_id, %s), updated_at = NOW() WHERE name = %s",
+            (until.toordinal(), WATERMARK)
+        )
+
+    return dict(Counter(row["coach_id"] for row in missed))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.missed_workouts")
+    parser.add_argument("--since", type=date.fromisoformat,
+                        help="re-check from this day (YYYY-MM-DD) instead of the watermark")
+    args = parser.parse_args()
+
+    from backend.rest_entry import create_app
+
+    app = create_app()
+    with app.app_context():
+        per_coach = detect(since=args.since)
+    print(f"{sum(per_coach.values())} missed workouts for {len(per_coach)} coaches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#------------------------------------------------------------
+# Nutrition engine: MealItems x Foods -> Nutrients.
+#
+# Foods are loaded once into NumPy arrays: the sorted food ids
+# and a (foods x 4) matrix of calories, protein, carbs and fat
+# per unit. A batch of meal items is then the sparse product
+#
+#   totals[meal] = sum over its items of quantity * food_row
+#
+# done with np.bincount over the item arrays, one pass per
+# nutrient column, with no Python loop over items. A
+# MealItems.quantity is taken to be a number of the food's
+# units.
+#
+# The loaded table is shared by every request in the worker
+# through `catalog`, and reloaded lazily after a Foods write
+# bumps the catalog version.
+#
+# refresh_meals() is the on-write path for a few meals, and
+# can run inside the caller's transaction. backfill() streams
+# the whole MealItems table in chunks:
+#
+#   python -m backend.nutrition [--chunk-items N]
+#------------------------------------------------------------
+import argparse
+import bisect
+import logging
+import threading
+import time
+
+import numpy as np
+
+from backend.db_connection import db as db_connection
+
+logger = logging.getLogger(__name__)
+
+NUTRIENT_COLUMNS = ("calories", "protein_grams", "carbs_grams", "fat_grams")
+
+BACKFILL_CHUNK_ITEMS = 200000
+
+# executemany() folds rows into multi-row INSERTs only for the
+# VALUES(col) form of ON DUPLICATE KEY UPDATE
+_UPSERT_NUTRIENTS = (
+    "INSERT INTO Nutrients (meal_id, calories, protein_grams, carbs_grams, fat_grams) "
+    "VALUES (%s, %s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE calories = VALUES(calories), protein_grams = VALUES(protein_grams), "
+    "carbs_grams = VALUES(carbs_grams), fat_grams = VALUES(fat_grams)"
+)
+
+
+class FoodTable:
+    """The Foods table as a sorted id array and a per-unit nutrient matrix."""
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: row["food_id"])
+        self.ids = np.array([row["food_id"] for row in rows], dtype=np.int64)
+        self.names = [row.get("name") for row in rows]
+        self.units = [row.get("unit") for row in rows]
+        # NULL macros count as zero
+        self.matrix = np.nan_to_num(np.array(
+            [(row["kcal_per_unit"], row["protein_g"], row["carbs_g"], row["fat_g"]) for row in rows],
+            dtype=float,
+        ).reshape(len(rows), len(NUTRIENT_COLUMNS)))
+
+    @classmethod
+    def load(cls):
+        return cls(db_connection.execute_query(
+            "SELECT food_id, name, unit, kcal_per_unit, protein_g, carbs_g, fat_g FROM Foods"
+        ))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def positions(self, food_ids):
+        """Row of each food id in the matrix."""
+        food_ids = np.asarray(food_ids, dtype=np.int64)
+        positions = np.searchsorted(self.ids, food_ids)
+        if len(self.ids):
+            positions[positions >= len(self.ids)] = 0
+            missing = self.ids[positions] != food_ids
+        else:
+            missing = np.ones(len(food_ids), dtype=bool)
+        if missing.any():
+            raise KeyError(f"Unknown food ids: {sorted(set(food_ids[missing].tolist()))}")
+        return positions
+
+    def row(self, food_id):
+        """One food as a dict, or None if the id is unknown."""
+        position = int(np.searchsorted(self.ids, food_id))
+        if position >= len(self.ids) or self.ids[position] != food_id:
+            return None
+        food = {"food_id": food_id, "name": self.names[position], "unit": self.units[position]}
+        food.update(zip(("kcal_per_unit", "protein_g", "carbs_g", "fat_g"), self.matrix[position].tolist()))
+        return food
+
+
+class FoodCatalog:
+    """
+    The Foods table cached in process memory. Every Foods write calls
+    invalidate(), which bumps the catalog version; the next table()
+    call sees a stale version and reloads from MySQL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table = None
+        self.version = 0
+        self._loaded_version = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+
+    def table(self):
+        with self._lock:
+            if self._loaded_version == self.version:
+                self.hits += 1
+                return self._table
+            self.misses += 1
+            version = self.version
+
+        # load outside the lock; a write during the load bumps the
+        # version again, so that table is replaced on the next call
+        table = FoodTable.load()
+        with self._lock:
+            self.reloads += 1
+            if self._loaded_version is None or version >= self._loaded_version:
+                self._table = table
+                self._loaded_version = version
+        return table
+
+    def get(self, food_id):
+        return self.table().row(food_id)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "loaded_version": self._loaded_version,
+                "foods": len(self._table) if self._table is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "reloads": self.reloads,
+            }
+
+
+catalog = FoodCatalog()
+
+
+def compute(foods, meal_ids, food_ids, quantities):
+    """
+    Total each meal's nutrients from its items, given as three parallel
+    sequences. Returns (meal ids, totals) with one row of totals per meal.
+    """
+    meal_ids = np.asarray(meal_ids, dtype=np.int64)
+    food_ids = np.asarray(food_ids, dtype=np.int64)
+    quantities = np.asarray(quantities, dtype=float)
+
+    meals, meal_positions = np.unique(meal_ids, return_inverse=True)
+    per_item = foods.matrix[foods.positions(food_ids)] * quantities[:, None]
+    totals = np.column_stack([
+        np.bincount(meal_positions, weights=per_item[:, column], minlength=len(meals))
+        for column in range(len(NUTRIENT_COLUMNS))
+    ])
+    return meals, totals
+
+
+def _nutrient_rows(meals, totals):
+    calories = np.rint(totals[:, 0]).astype(np.int64).tolist()
+    grams = np.round(totals[:, 1:], 2).tolist()
+    return [
+        (meal_id, kcal, protein, carbs, fat)
+        for meal_id, kcal, (protein, carbs, fat) in zip(meals.tolist(), calories, grams)
+    ]
+
+
+def refresh_meals(meal_ids, cursor=None, foods=None):
+    """
+    Recompute and store Nutrients for the given MealLogs ids. Pass the
+    cursor of an open transaction to update Nutrients together with the
+    MealItems write; meals left with no items are stored as zeros.
+    """
+    meal_ids = sorted(set(meal_ids))
+    if not meal_ids:
+        return 0
+    if cursor is None:
+        with db_connection.transaction() as cursor:
+            return refresh_meals(meal_ids, cursor, foods)
+
+    if foods is None:
+        foods = catalog.table()
+    placeholders = ", ".join(["%s"] * len(meal_ids))
+    cursor.execute(
+        f"SELECT meal_id, food_id, quantity FROM MealItems WHERE meal_id IN ({placeholders})",
+        tuple(meal_ids)
+    )
+    items = cursor.fetchall()
+
+    meals, totals = compute(
+        foods,
+        [item["meal_id"] for item in items],
+        [item["food_id"] for item in items],
+        [item["quantity"] for item in items],
+    )
+    rows = _nutrient_rows(meals, totals)
+    computed = set(meals.tolist())
+    rows.extend((meal_id, 0, 0, 0, 0) for meal_id in meal_ids if meal_id not in computed)
+    cursor.executemany(_UPSERT_NUTRIENTS, rows)
+    return len(rows)
+
+
+def backfill(chunk_items=BACKFILL_CHUNK_ITEMS):
+    """
+    Recompute Nutrients for every meal with items. MealItems is read in
+    primary key order from a server-side cursor and processed
+    `chunk_items` at a time, never splitting a meal across chunks; each
+    chunk is written and committed on a second connection.
+    """
+    foods = catalog.table()
+    meal_ids, food_ids, quantities = [], [], []
+    written = 0
+    started = time.perf_counter()
+
+    conn = db_connection.connect()
+    try:
+        def flush(upto):
+            nonlocal written
+            meals, totals = compute(foods, meal_ids[:upto], food_ids[:upto], quantities[:upto])
+            with conn.cursor() as cursor:
+                cursor.executemany(_UPSERT_NUTRIENTS, _nutrient_rows(meals, totals))
+            conn.commit()
+            written += len(meals)
+            del meal_ids[:upto], food_ids[:upto], quantities[:upto]
+            logger.info("nutrients backfill: %d meals written", written)
+
+        for _, batch in db_connection.stream_batches(
+            "SELECT meal_id, food_id, quantity FROM MealItems ORDER BY meal_id, item_num",
+            batch_size=10000,
+        ):
+            for item in batch:
+                meal_ids.append(item["meal_id"])
+                food_ids.append(item["food_id"])
+                quantities.append(item["quantity"])
+            if len(meal_ids) >= chunk_items:
+                # hold back the last meal, its items may continue in the next batch
+                cut = bisect.bisect_left(meal_ids, meal_ids[-1])
+                if cut:
+                    flush(cut)
+        if meal_ids:
+            flush(len(meal_ids))
+    finally:
+        db_connection.release(conn)
+
+    logger.info("nutrients backfill: %d meals in %.1f s", written, time.perf_counter() - started)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.nutrition")
+    parser.add_argument("--chunk-items", type=int, default=BACKFILL_CHUNK_ITEMS,
+                        help="meal items computed and written per transaction")
+    args = parser.parse_args()
+
+    from backend.rest_entry import create_app
+
+    create_app()
+    print(f"computed nutrients for {backfill(args.chunk_items)} meals")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#------------------------------------------------------------
+# Keyset (cursor) pagination for list endpoints.
+#
+# A page is requested with ?limit=N and continued with the
+# opaque ?after=<cursor> the previous page returned in its
+# X-Next-Cursor header. The cursor holds the ORDER BY values
+# of the last row sent, so the next page is an index range
+# scan from that row instead of an OFFSET that re-reads every
+# earlier page.
+#------------------------------------------------------------
+import base64
+import json
+from bisect import bisect_right
+from urllib.parse import urlencode
+
+from flask import request
+
+from backend.columnar import columnar_response, wants_columnar
+from backend.db_connection import db as db_connection
+from backend.streaming import stream_rows
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+
+class PaginationError(ValueError):
+    """Raised for a malformed limit or cursor; answered with a 400."""
+
+
+class Keyset:
+    """
+    The ORDER BY of a listing, as (column, descending) pairs. The last
+    column must be unique and NOT NULL (normally the primary key) so that
+    every row has exactly one position.
+    """
+
+    def __init__(self, *columns):
+        self.columns = [(name, descending) for name, descending in columns]
+
+    def order_by(self):
+        return ", ".join(
+            f"{name} {'DESC' if descending else 'ASC'}" for name, descending in self.columns
+        )
+
+    def after(self, values):
+        """SQL condition (and params) matching rows strictly after `values`."""
+        disjuncts = []
+        params = []
+        for i, (name, descending) in enumerate(self.columns):
+            terms = []
+            term_params = []
+            for (prev_name, _), prev_value in zip(self.columns[:i], values[:i]):
+                if prev_value is None:
+                    terms.append(f"{prev_name} IS NULL")
+                else:
+                    terms.append(f"{prev_name} = %s")
+                    term_params.append(prev_value)
+
+            # MySQL sorts NULL lowest: first when ascending, last when descending
+            value = values[i]
+            if descending:
+                if value is None:
+                    continue
+                terms.append(f"({name} < %s OR {name} IS NULL)")
+                term_params.append(value)
+            else:
+                if value is None:
+                    terms.append(f"{name} IS NOT NULL")
+                else:
+                    terms.append(f"{name} > %s")
+                    term_params.append(value)
+
+            disjuncts.append("(" + " AND ".join(terms) + ")")
+            params.extend(term_params)
+
+        if not disjuncts:
+            return "1=0", []
+        return "(" + " OR ".join(disjuncts) + ")", params
+
+    def values_for(self, row):
+        """The row's ORDER BY values, as they are stored in a cursor."""
+        lowered = {key.lower(): value for key, value in row.items()}
+        return [_cursor_value(lowered.get(name.lower())) for name, _ in self.columns]
+
+    def cursor_for(self, row):
+        raw = json.dumps(self.values_for(row), separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise PaginationError("Invalid 'after' cursor")
+        if not isinstance(values, list) or len(values) != len(self.columns):
+            raise PaginationError("Invalid 'after' cursor")
+        return values
+
+
+def _cursor_value(value):
+    # MySQL compares DATE/TIME/DATETIME/DECIMAL columns against their
+    # string forms, so strings round-trip every column type we order by
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+class Page:
+    def __init__(self, keyset, limit, after):
+        self.keyset = keyset
+        self.limit = limit
+        self.after = after
+
+    @classmethod
+    def from_request(cls, keyset):
+        """Return the requested Page, or None when the client did not ask to paginate."""
+        limit = request.args.get("limit")
+        after = request.args.get("after")
+        if limit is None and after is None:
+            return None
+
+        if limit is None:
+            limit = DEFAULT_LIMIT
+        else:
+            try:
+                limit = int(limit)
+            except ValueError:
+                raise PaginationError("limit must be an integer")
+            if limit < 1:
+                raise PaginationError("limit must be at least 1")
+            limit = min(limit, MAX_LIMIT)
+
+        return cls(keyset, limit, keyset.decode(after) if after else None)
+
+    def apply(self, query, params):
+        """
+        Extend a query that already has a WHERE clause with this page's
+        keyset filter, ORDER BY and LIMIT.
+        """
+        params = list(params)
+        if self.after is not None:
+            condition, after_params = self.keyset.after(self.after)
+            query += " AND " + condition
+            params.extend(after_params)
+        # one extra row tells us whether there is a next page
+        query += f" ORDER BY {self.keyset.order_by()} LIMIT %s"
+        params.append(self.limit + 1)
+        return query, tuple(params)
+
+
+def paginated_rows(keyset, query, params=(), columnar=False, always_page=False):
+    """
+    Run a listing query and stream it back. Without ?limit/?after the whole
+    result streams as before; with them only one page is read and the
+    cursor for the next page goes in the X-Next-Cursor and Link headers.
+    Listings that pass columnar=True also honour ?format=columnar, and
+    those that pass always_page=True return DEFAULT_LIMIT rows when no
+    limit is given.
+    """
+    respond = columnar_response if columnar and wants_columnar() else stream_rows
+
+    page = Page.from_request(keyset)
+    if page is None and always_page:
+        page = Page(keyset, DEFAULT_LIMIT, None)
+    if page is None:
+        query += f" ORDER BY {keyset.order_by()}"
+        return respond(db_connection.stream_query(query, tuple(params)))
+
+    query, params = page.apply(query, params)
+    rows = db_connection.execute_query(query, params)
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = keyset.cursor_for(rows[-1])
+
+    return _with_next_link(respond(rows), page, next_cursor)
+
+
+def paginated_list(keyset, rows, sort_key):
+    """
+    Page through rows computed in memory, with the same limit/after
+    parameters and headers as paginated_rows(). `rows` must be sorted by
+    sort_key(*keyset.values_for(row)), which takes one argument per keyset
+    column; it is also applied to the cursor values to find where the next
+    page starts. Always pages.
+    """
+    page = Page.from_request(keyset) or Page(keyset, DEFAULT_LIMIT, None)
+    start = 0
+    if page.after is not None:
+        keys = [sort_key(*keyset.values_for(row)) for row in rows]
+        start = bisect_right(keys, sort_key(*page.after))
+
+    end = start + page.limit
+    next_cursor = keyset.cursor_for(rows[end - 1]) if end < len(rows) else None
+    return _with_next_link(stream_rows(rows[start:end]), page, next_cursor)
+
+
+def _with_next_link(response, page, next_cursor):
+    if next_cursor is not None:
+        args = request.args.to_dict()
+        args.update(limit=str(page.limit), after=next_cursor)
+        next_url = f"{request.base_url}?{urlencode(args)}"
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
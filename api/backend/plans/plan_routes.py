@@ -1,20 +1,15 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db as db_connection
-
-def get_db():
-    return db_connection.get_db().cursor()
+from backend.streaming import stream_rows
 
 plans = Blueprint("plans", __name__)
 
 
 @plans.route("", methods=["GET"])
 def get_plans():
-    db = get_db()
-    db.execute("SELECT * FROM Plans")
-    plans = db.fetchall()
-    db.close()
+    plans = db_connection.stream_query("SELECT * FROM Plans")
     
-    return jsonify(plans), 200
+    return stream_rows(plans)
 
 
 @plans.route("", methods=["POST"])
@@ -30,14 +25,10 @@ def create_plan():
         error = "Client_ID is required"
     
     if error is None:
-        db = get_db()
-        db.execute(
+        plan_id = db_connection.insert_query(
             "INSERT INTO Plans (Plan_Name, Client_ID, Start_Date, End_Date, Description) VALUES (%s, %s, %s, %s, %s)",
             (data["Plan_Name"], data["Client_ID"], data.get("Start_Date"), data.get("End_Date"), data.get("Description"))
         )
-        db_connection.get_db().commit()
-        plan_id = db.lastrowid
-        db.close()
         return jsonify({"message": "Plan created and assigned successfully", "plan_id": plan_id}), 201
     
     return jsonify({"error": error}), 400
@@ -45,15 +36,12 @@ def create_plan():
 
 @plans.route("/<int:plan_id>/exercises", methods=["GET"])
 def get_plan_exercises(plan_id):
-    db = get_db()
-    db.execute(
+    exercises = db_connection.stream_query(
         "SELECT pe.*, e.Exercise_Name, e.Video_URL FROM Plan_Exercises pe JOIN Exercises e ON pe.Exercise_ID = e.Exercise_ID WHERE pe.Plan_ID = %s",
         (plan_id,)
     )
-    exercises = db.fetchall()
-    db.close()
     
-    return jsonify(exercises), 200
+    return stream_rows(exercises)
 
 
 @plans.route("/<int:plan_id>/exercises", methods=["PUT"])
@@ -71,13 +59,10 @@ def update_plan_exercises(plan_id):
         error = "reps is required"
     
     if error is None:
-        db = get_db()
-        db.execute(
+        db_connection.update_query(
             "UPDATE Plan_Exercises SET Sets = %s, Reps = %s WHERE Plan_ID = %s AND Exercise_ID = %s",
             (data["sets"], data["reps"], plan_id, data["exercise_id"])
         )
-        db_connection.get_db().commit()
-        db.close()
         return jsonify({"message": "Exercise sets/reps updated successfully"}), 200
     
     return jsonify({"error": error}), 400
@@ -85,12 +70,9 @@ def update_plan_exercises(plan_id):
 
 @plans.route("/exercises", methods=["GET"])
 def get_exercises():
-    db = get_db()
-    db.execute("SELECT * FROM Exercises")
-    exercises = db.fetchall()
-    db.close()
+    exercises = db_connection.stream_query("SELECT * FROM Exercises")
     
-    return jsonify(exercises), 200
+    return stream_rows(exercises)
 
 
 @plans.route("/exercises", methods=["POST"])
@@ -106,14 +88,10 @@ def create_exercise():
         error = "Video_URL is required"
     
     if error is None:
-        db = get_db()
-        db.execute(
+        exercise_id = db_connection.insert_query(
             "INSERT INTO Exercises (Exercise_Name, Video_URL, Description, Muscle_Group) VALUES (%s, %s, %s, %s)",
             (data["Exercise_Name"], data["Video_URL"], data.get("Description"), data.get("Muscle_Group"))
         )
-        db_connection.get_db().commit()
-        exercise_id = db.lastrowid
-        db.close()
         return jsonify({"message": "Exercise created successfully", "exercise_id": exercise_id}), 201
     
     return jsonify({"error": error}), 400
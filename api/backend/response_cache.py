@@ -0,0 +1,151 @@
+#------------------------------------------------------------
+# Response cache for per-user GET endpoints.
+#
+# Streamlit re-runs a page on every interaction, so the same
+# user's meals, workouts and goals are fetched over and over
+# while they rarely change. A view decorated with @cached()
+# keeps its response body in an LRU + TTL cache keyed by
+# (endpoint, user id, query args, Accept header). Writes call
+# invalidate(user_id), which drops every cached response for
+# that user and no one else.
+#
+# Responses are still streamed on a miss: the body is copied
+# as it goes out and stored only once it has been sent in
+# full, and only if it is at most MAX_BODY_BYTES.
+#------------------------------------------------------------
+import threading
+from functools import wraps
+
+from flask import Response, request
+
+from backend.cache import TTLCache
+
+MAX_ENTRIES = 1024
+TTL = 300
+MAX_BODY_BYTES = 1024 * 1024
+
+# headers a cached response is replayed with
+_KEPT_HEADERS = ("Content-Type", "X-Next-Cursor", "Link")
+
+
+def _user_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ResponseCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL):
+        self.entries = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+        # user id -> keys cached for them; keys the LRU has since
+        # dropped are pruned as the set grows
+        self._keys_by_user = {}
+        # bumped by invalidate(), so a response that was being sent
+        # when the user's data changed is not stored afterwards
+        self._generations = {}
+        self.invalidations = 0
+        self.oversized = 0
+
+    def _store(self, user_id, generation, key, entry):
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self.entries.set(key, entry)
+            keys = self._keys_by_user.setdefault(user_id, set())
+            keys.add(key)
+            if len(keys) > 64:
+                keys.intersection_update([k for k in keys if k in self.entries])
+
+    def invalidate(self, user_id):
+        """Drop every cached response for the user."""
+        user_id = _user_id(user_id)
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, ())
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.invalidations += 1
+        for key in keys:
+            self.entries.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._keys_by_user.clear()
+        self.entries.clear()
+
+    def stats(self):
+        stats = self.entries.stats()
+        stats.update(
+            body_bytes=sum(len(body) for _, _, body in self.entries.values()),
+            max_body_bytes=MAX_BODY_BYTES,
+            users=len(self._keys_by_user),
+            invalidations=self.invalidations,
+            oversized=self.oversized,
+        )
+        return stats
+
+    def _tee(self, user_id, generation, key, response):
+        """Replace the response body with one that stores a copy once fully sent."""
+        headers = [(name, response.headers[name]) for name in _KEPT_HEADERS if name in response.headers]
+        original = response.response
+        chunks = response.iter_encoded()
+
+        def body():
+            parts, size = [], 0
+            for chunk in chunks:
+                if parts is not None:
+                    size += len(chunk)
+                    if size > MAX_BODY_BYTES:
+                        parts = None
+                        self.oversized += 1
+                    else:
+                        parts.append(chunk)
+                yield chunk
+            if parts is not None:
+                self._store(user_id, generation, key, (response.status_code, headers, b"".join(parts)))
+
+        response.response = body()
+        # the server closes the response even when the client goes away
+        # before the body is read, and that must still release the cursor
+        if hasattr(original, "close"):
+            response.call_on_close(original.close)
+
+    def cached(self, view_arg=None, query_arg=None):
+        """
+        Cache a GET view per user, taking the user id from the URL
+        parameter `view_arg` or the query argument `query_arg`. Requests
+        without a user id are not cached.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                user_id = _user_id(kwargs.get(view_arg) if view_arg else request.args.get(query_arg))
+                if user_id is None:
+                    return view(*args, **kwargs)
+
+                key = (
+                    request.endpoint,
+                    user_id,
+                    tuple(sorted(request.args.items(multi=True))),
+                    request.headers.get("Accept", ""),
+                )
+                entry = self.entries.get(key)
+                if entry is not None:
+                    status, headers, body = entry
+                    response = Response(body, status=status, headers=headers)
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+
+                with self._lock:
+                    generation = self._generations.get(user_id, 0)
+                response = view(*args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+                self._tee(user_id, generation, key, response)
+                response.headers["X-Cache"] = "MISS"
+                return response
+            return wrapper
+        return decorator
+
+
+responses = ResponseCache()
@@ -1,13 +1,18 @@
-from flask import Flask
+from flask import Flask, jsonify
 from dotenv import load_dotenv
 import os
 import logging
 from logging.handlers import RotatingFileHandler
 
-from backend.db_connection import db
+from backend.db_connection import db, PoolExhausted
+from backend.json_provider import OrjsonProvider
+from backend.pagination import PaginationError
 
 def create_app():
     app = Flask(__name__)
+    # orjson encodes rows (dates, TIME and DECIMAL columns included)
+    # several times faster than the stdlib provider
+    app.json = OrjsonProvider(app)
 
     app.logger.setLevel(logging.DEBUG)
     app.logger.info('API startup')
@@ -39,10 +44,27 @@ def create_app():
         "DB_NAME"
     ).strip()  # Change this to your DB name
 
+    # Connection pool sizing. Every request borrows one connection from
+    # the pool instead of paying a fresh TCP + auth handshake.
+    app.config["MYSQL_POOL_MIN_SIZE"] = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    app.config["MYSQL_POOL_MAX_SIZE"] = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    app.config["MYSQL_POOL_MAX_IDLE"] = int(os.getenv("DB_POOL_MAX_IDLE", "300"))
+    app.config["MYSQL_POOL_MAX_LIFETIME"] = int(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+    app.config["MYSQL_POOL_CHECKOUT_TIMEOUT"] = int(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "10"))
+
     # Initialize the database object with the settings above.
     app.logger.info("current_app(): starting the database connection")
     db.init_app(app)
 
+    @app.errorhandler(PoolExhausted)
+    def handle_pool_exhausted(error):
+        app.logger.error(f"Database pool exhausted: {error}")
+        return jsonify({"error": "Database is busy, please retry"}), 503
+
+    @app.errorhandler(PaginationError)
+    def handle_pagination_error(error):
+        return jsonify({"error": str(error)}), 400
+
     # Register the routes from each Blueprint with the app object
     # and give a url prefix to each
     app.logger.info("create_app(): registering blueprints with Flask app object.")
@@ -54,6 +76,10 @@ def create_app():
     from .clients.client_routes import clients
     from .plans.plan_routes import plans
     from .admin.admin_routes import admin
+    from .coach.coach_routes import coach_bp
+    from .dietician.dietician_routes import dietician_bp
+    from .analytics.analytics_routes import analytics
+    from .foods.food_routes import foods
     
     app.register_blueprint(simple_routes)
     app.register_blueprint(ngos, url_prefix="/ngo")
@@ -62,6 +88,10 @@ def create_app():
     app.register_blueprint(clients, url_prefix="/clients")
     app.register_blueprint(plans, url_prefix="/plans")
     app.register_blueprint(admin, url_prefix="/admin")
+    app.register_blueprint(analytics, url_prefix="/analytics")
+    app.register_blueprint(foods, url_prefix="/foods")
+    app.register_blueprint(coach_bp)
+    app.register_blueprint(dietician_bp)
 
     # Don't forget to return the app object
     return app
@@ -0,0 +1,208 @@
+#------------------------------------------------------------
+# Day / week / month rollup cubes for Meals and Workouts.
+#
+# WorkoutRollups and MealRollups hold pre-aggregated totals
+# per (grain, period, user, dimension). refresh() folds in
+# only the source rows inserted since the last run, tracked
+# as a high-water mark on the AUTO_INCREMENT id in the
+# Watermarks table, and adds them to all three grains.
+#
+# The watermark only sees new ids, so edits and deletes of
+# rows that were already folded in are picked up by a full
+# rebuild:
+#
+#   python -m backend.rollups            incremental refresh
+#   python -m backend.rollups --rebuild  recompute from scratch
+#
+# Reads go through Cube.query(), which answers from the
+# coarsest grain whose periods line up with the requested
+# range and interval, so a multi-year monthly chart reads a
+# few dozen month rows per user instead of every day.
+#------------------------------------------------------------
+import argparse
+from datetime import timedelta
+
+from backend.db_connection import db as db_connection
+
+GRAINS = ("day", "week", "month")
+
+# SQL for the first day of the period containing a date
+_PERIOD_START = {
+    "day": "{0}",
+    "week": "DATE_SUB({0}, INTERVAL WEEKDAY({0}) DAY)",
+    "month": "DATE_SUB({0}, INTERVAL DAYOFMONTH({0}) - 1 DAY)",
+}
+
+# the grains each output interval can be re-aggregated from
+_SOURCES = {
+    "day": ("day",),
+    "week": ("week", "day"),
+    "month": ("month", "day"),
+}
+
+
+def _aligned(grain, start, end):
+    """True when [start, end] covers whole periods of `grain`."""
+    if grain == "week":
+        return (start is None or start.weekday() == 0) and (end is None or end.weekday() == 6)
+    if grain == "month":
+        return (start is None or start.day == 1) and (end is None or (end + timedelta(days=1)).day == 1)
+    return True
+
+
+class Cube:
+    def __init__(self, table, source, id_column, date_column, dimension, dimension_sql, measures):
+        self.table = table
+        self.source = source
+        self.id_column = id_column
+        self.date_column = date_column
+        self.dimension = dimension
+        self.dimension_sql = dimension_sql
+        # [(rollup column, aggregate over the source rows)]
+        self.measures = measures
+
+    @property
+    def watermark(self):
+        return self.table
+
+    def _refresh_sql(self, grain):
+        columns = ", ".join(name for name, _ in self.measures)
+        aggregates = ", ".join(f"{sql} AS new_{name}" for name, sql in self.measures)
+        updates = ", ".join(f"{name} = {name} + new_{name}" for name, _ in self.measures)
+        period = _PERIOD_START[grain].format(self.date_column)
+        return (
+            f"INSERT INTO {self.table} (grain, period_start, user_id, {self.dimension}, {columns}) "
+            f"SELECT * FROM ("
+            f"SELECT '{grain}' AS new_grain, {period} AS new_period, User_ID AS new_user, "
+            f"{self.dimension_sql} AS new_dimension, {aggregates} "
+            f"FROM {self.source} "
+            f"WHERE {self.id_column} > %s AND {self.id_column} <= %s AND {self.date_column} IS NOT NULL "
+            f"GROUP BY new_period, new_user, new_dimension"
+            f") AS batch "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+
+    def refresh(self):
+        """Fold rows inserted since the last refresh into every grain; return how many."""
+        with db_connection.transaction() as cursor:
+            cursor.execute(
+                "INSERT IGNORE INTO Watermarks (name, last_id) VALUES (%s, 0)", (self.watermark,)
+            )
+            # the row lock keeps two refreshes from folding in the same ids
+            cursor.execute(
+                "SELECT last_id FROM Watermarks WHERE name = %s FOR UPDATE", (self.watermark,)
+            )
+            low = cursor.fetchone()["last_id"]
+            cursor.execute(
+                f"SELECT MAX({self.id_column}) AS high, COUNT(*) AS new_rows "
+                f"FROM {self.source} WHERE {self.id_column} > %s",
+                (low,)
+            )
+            batch = cursor.fetchone()
+            if not batch["new_rows"]:
+                return 0
+
+            for grain in GRAINS:
+                cursor.execute(self._refresh_sql(grain), (low, batch["high"]))
+            cursor.execute(
+                "UPDATE Watermarks SET last_id = %s, updated_at = NOW() WHERE name = %s",
+                (batch["high"], self.watermark)
+            )
+            return batch["new_rows"]
+
+    def rebuild(self):
+        with db_connection.transaction() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                "INSERT INTO Watermarks (name, last_id) VALUES (%s, 0) "
+                "ON DUPLICATE KEY UPDATE last_id = 0",
+                (self.watermark,)
+            )
+        return self.refresh()
+
+    def pick_grain(self, interval, start, end):
+        """The coarsest stored grain that can answer `interval` buckets over [start, end]."""
+        for grain in _SOURCES[interval]:
+            if _aligned(grain, start, end):
+                return grain
+        return "day"
+
+    def query(self, interval, start=None, end=None, user_id=None, by_dimension=True):
+        """
+        Totals per `interval` period (and per dimension value) between
+        start and end inclusive, optionally for one user. Returns the
+        grain that was read and the rows.
+        """
+        grain = self.pick_grain(interval, start, end)
+        period = "period_start" if grain == interval else _PERIOD_START[interval].format("period_start")
+        dimension = f", {self.dimension}" if by_dimension else ""
+        sums = ", ".join(f"CAST(SUM({name}) AS SIGNED) AS {name}" for name, _ in self.measures)
+
+        query = f"SELECT {period} AS period{dimension}, {sums} FROM {self.table} WHERE grain = %s"
+        params = [grain]
+        if user_id is not None:
+            query += " AND user_id = %s"
+            params.append(user_id)
+        if start is not None:
+            query += " AND period_start >= %s"
+            params.append(start)
+        if end is not None:
+            query += " AND period_start <= %s"
+            params.append(end)
+        query += f" GROUP BY period{dimension} ORDER BY period{dimension}"
+
+        return grain, db_connection.execute_query(query, tuple(params))
+
+
+WORKOUT_CUBE = Cube(
+    "WorkoutRollups", "Workouts", "Workout_ID", "Workout_Date",
+    "workout_type", "COALESCE(Workout_Type, '')",
+    [
+        ("workouts", "COUNT(*)"),
+        ("minutes", "SUM(COALESCE(Duration_Minutes, 0))"),
+        ("calories_burned", "SUM(COALESCE(Calories_Burned, 0))"),
+    ],
+)
+
+# same hour ranges as the dietitian Meal Patterns tab
+MEAL_CUBE = Cube(
+    "MealRollups", "Meals", "Meal_ID", "Meal_Date",
+    "meal_bucket",
+    "CASE WHEN Meal_Time IS NULL THEN 'untimed'"
+    " WHEN HOUR(Meal_Time) BETWEEN 5 AND 10 THEN 'breakfast'"
+    " WHEN HOUR(Meal_Time) BETWEEN 11 AND 14 THEN 'lunch'"
+    " WHEN HOUR(Meal_Time) BETWEEN 17 AND 21 THEN 'dinner'"
+    " ELSE 'snack' END",
+    [
+        ("meals", "COUNT(*)"),
+        ("calories", "SUM(Calories)"),
+    ],
+)
+
+CUBES = {"workouts": WORKOUT_CUBE, "meals": MEAL_CUBE}
+
+
+def refresh_all():
+    return {name: cube.refresh() for name, cube in CUBES.items()}
+
+
+def rebuild_all():
+    return {name: cube.rebuild() for name, cube in CUBES.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.rollups")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every cube from scratch")
+    args = parser.parse_args()
+
+    from backend.rest_entry import create_app
+
+    app = create_app()
+    with app.app_context():
+        counts = rebuild_all() if args.rebuild else refresh_all()
+        for name, rows in counts.items():
+            print(f"{name}: folded in {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#------------------------------------------------------------
+# Helpers for sending large results as chunked HTTP responses
+#------------------------------------------------------------
+from itertools import islice
+
+from flask import Response, current_app, request, stream_with_context
+
+# rows per HTTP chunk; large enough to avoid a write per row,
+# small enough to keep memory flat
+CHUNK_ROWS = 200
+
+JSON_MIMETYPE = "application/json"
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def json_array_chunks(rows, chunk_rows=CHUNK_ROWS):
+    """Yield the bytes of a JSON array a few rows at a time."""
+    dumps = current_app.json.dumps_bytes
+    first = True
+    yield b"["
+    for batch in _batches(rows, chunk_rows):
+        # encode the whole batch in one call and drop its brackets
+        body = dumps(batch)[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+
+def ndjson_chunks(rows, chunk_rows=CHUNK_ROWS):
+    """Yield one JSON document per row, newline separated."""
+    dumps = current_app.json.dumps_bytes
+    for batch in _batches(rows, chunk_rows):
+        yield b"".join(dumps(row) + b"\n" for row in batch)
+
+
+def stream_json_array(rows, status=200):
+    """
+    Return a chunked application/json response for an iterable of rows.
+
+    Pair with db.stream_query() so rows go from the server-side cursor to
+    the socket without the whole result ever being held in memory.
+    """
+    body = stream_with_context(json_array_chunks(rows))
+    return Response(body, status=status, mimetype=JSON_MIMETYPE)
+
+
+def stream_ndjson(rows, status=200):
+    """Return a chunked application/x-ndjson response for an iterable of rows."""
+    body = stream_with_context(ndjson_chunks(rows))
+    return Response(body, status=status, mimetype=NDJSON_MIMETYPE)
+
+
+def wants_ndjson():
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def stream_rows(rows, status=200):
+    """
+    Stream a list result in the format the client asked for: NDJSON when
+    the Accept header prefers application/x-ndjson, a JSON array otherwise.
+    """
+    if wants_ndjson():
+        return stream_ndjson(rows, status)
+    return stream_json_array(rows, status)
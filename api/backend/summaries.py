@@ -0,0 +1,122 @@
+#------------------------------------------------------------
+# DailyUserSummary: per-user, per-day totals of calories in,
+# calories burned, meals and workout minutes.
+#
+# The meal and workout handlers call meal_changed() /
+# workout_changed() inside the same transaction as their
+# INSERT/UPDATE/DELETE, passing the row before and after the
+# write, so the summary always moves with the raw tables.
+# rebuild() recomputes it from scratch for backfills:
+#
+#   python -m backend.summaries [--user-id N]
+#------------------------------------------------------------
+import argparse
+
+from backend.db_connection import db as db_connection
+
+_APPLY_DELTA = """
+INSERT INTO DailyUserSummary
+    (user_id, summary_date, calories_in, meal_count, calories_burned, workout_count, workout_minutes)
+VALUES (%s, %s, %s, %s, %s, %s, %s) AS delta
+ON DUPLICATE KEY UPDATE
+    calories_in = DailyUserSummary.calories_in + delta.calories_in,
+    meal_count = DailyUserSummary.meal_count + delta.meal_count,
+    calories_burned = DailyUserSummary.calories_burned + delta.calories_burned,
+    workout_count = DailyUserSummary.workout_count + delta.workout_count,
+    workout_minutes = DailyUserSummary.workout_minutes + delta.workout_minutes
+"""
+
+# a day whose last meal and workout were removed drops out of the table
+_DELETE_EMPTY = """
+DELETE FROM DailyUserSummary
+WHERE user_id = %s AND summary_date = %s AND meal_count = 0 AND workout_count = 0
+"""
+
+_REBUILD = """
+INSERT INTO DailyUserSummary
+    (user_id, summary_date, calories_in, meal_count, calories_burned, workout_count, workout_minutes)
+SELECT user_id, summary_date, SUM(calories_in), SUM(meal_count),
+       SUM(calories_burned), SUM(workout_count), SUM(workout_minutes)
+FROM (
+    SELECT User_ID AS user_id, Meal_Date AS summary_date,
+           SUM(Calories) AS calories_in, COUNT(*) AS meal_count,
+           0 AS calories_burned, 0 AS workout_count, 0 AS workout_minutes
+    FROM Meals WHERE Meal_Date IS NOT NULL {meal_filter}
+    GROUP BY User_ID, Meal_Date
+    UNION ALL
+    SELECT User_ID, Workout_Date, 0, 0,
+           SUM(COALESCE(Calories_Burned, 0)), COUNT(*), SUM(COALESCE(Duration_Minutes, 0))
+    FROM Workouts WHERE 1=1 {workout_filter}
+    GROUP BY User_ID, Workout_Date
+) AS daily
+GROUP BY user_id, summary_date
+"""
+
+
+def _meal_totals(meal):
+    # (calories_in, meal_count, calories_burned, workout_count, workout_minutes)
+    return (meal["Calories"] or 0, 1, 0, 0, 0)
+
+
+def _workout_totals(workout):
+    return (0, 0, workout["Calories_Burned"] or 0, 1, workout["Duration_Minutes"] or 0)
+
+
+def _row_changed(cursor, old, new, date_column, totals):
+    # net the old and new contributions per day first, so editing a row
+    # without moving it costs one upsert instead of a remove and re-add
+    deltas = {}
+    for row, sign in ((old, -1), (new, 1)):
+        if row is None or row[date_column] is None:
+            continue
+        key = (row["User_ID"], row[date_column])
+        current = deltas.get(key, (0, 0, 0, 0, 0))
+        deltas[key] = tuple(total + sign * value for total, value in zip(current, totals(row)))
+
+    for (user_id, day), delta in deltas.items():
+        if not any(delta):
+            continue
+        cursor.execute(_APPLY_DELTA, (user_id, day) + delta)
+        if delta[1] < 0 or delta[3] < 0:
+            cursor.execute(_DELETE_EMPTY, (user_id, day))
+
+
+def meal_changed(cursor, old, new):
+    """Apply a meal write to the summary, given the row before and after (either may be None)."""
+    _row_changed(cursor, old, new, "Meal_Date", _meal_totals)
+
+
+def workout_changed(cursor, old, new):
+    """Apply a workout write to the summary, given the row before and after (either may be None)."""
+    _row_changed(cursor, old, new, "Workout_Date", _workout_totals)
+
+
+def rebuild(user_id=None):
+    """Recompute the summary from Meals and Workouts, for one user or everyone."""
+    with db_connection.transaction() as cursor:
+        if user_id is None:
+            cursor.execute("DELETE FROM DailyUserSummary")
+            cursor.execute(_REBUILD.format(meal_filter="", workout_filter=""))
+        else:
+            cursor.execute("DELETE FROM DailyUserSummary WHERE user_id = %s", (user_id,))
+            cursor.execute(
+                _REBUILD.format(meal_filter="AND User_ID = %s", workout_filter="AND User_ID = %s"),
+                (user_id, user_id),
+            )
+        return cursor.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m backend.summaries")
+    parser.add_argument("--user-id", type=int, help="only rebuild this user's rows")
+    args = parser.parse_args()
+
+    from backend.rest_entry import create_app
+
+    app = create_app()
+    with app.app_context():
+        print(f"rebuilt {rebuild(args.user_id)} daily summary rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,32 @@
 from flask import Blueprint, jsonify, request
 from backend.db_connection import db as db_connection
-
-def get_db():
-    return db_connection.get_db().cursor()
+from backend import summaries
+from backend.cache import TTLCache
+from backend.columnar import columnar_response, wants_columnar
+from backend.downsample import downsample_rows
+from backend.response_cache import responses
+from backend.streaming import stream_rows
 
 workouts = Blueprint("workouts", __name__)
 
+SERIES_METRICS = ("weight_kg", "body_fat_pct")
+
+# downsampled metric series keyed by (user, start, end, metric, points);
+# MetricLogs has no write endpoint here, so a short TTL keeps them fresh
+SERIES_CACHE = TTLCache(max_entries=512, ttl=300)
+
+
+def _read_workout(cursor, workout_id, lock=False):
+    cursor.execute(
+        "SELECT * FROM Workouts WHERE Workout_ID = %s" + (" FOR UPDATE" if lock else ""),
+        (workout_id,)
+    )
+    return cursor.fetchone()
+
 
 @workouts.route("/<int:workout_id>", methods=["GET"])
 def get_workout(workout_id):
-    db = get_db()
-    db.execute("SELECT * FROM Workouts WHERE Workout_ID = %s", (workout_id,))
-    workout = db.fetchone()
-    db.close()
+    workout = db_connection.fetch_one("SELECT * FROM Workouts WHERE Workout_ID = %s", (workout_id,))
     
     error = None
     if workout is None:
@@ -37,14 +51,15 @@ def create_workout():
         error = "Workout_Date is required"
     
     if error is None:
-        db = get_db()
-        db.execute(
-            "INSERT INTO Workouts (User_ID, Workout_Date, Workout_Type, Duration_Minutes, Calories_Burned, Notes) VALUES (%s, %s, %s, %s, %s, %s)",
-            (data["User_ID"], data["Workout_Date"], data.get("Workout_Type"), data.get("Duration_Minutes"), data.get("Calories_Burned"), data.get("Notes"))
-        )
-        db_connection.get_db().commit()
-        workout_id = db.lastrowid
-        db.close()
+        # the summary row moves in the same transaction as the workout
+        with db_connection.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO Workouts (User_ID, Workout_Date, Workout_Type, Duration_Minutes, Calories_Burned, Notes) VALUES (%s, %s, %s, %s, %s, %s)",
+                (data["User_ID"], data["Workout_Date"], data.get("Workout_Type"), data.get("Duration_Minutes"), data.get("Calories_Burned"), data.get("Notes"))
+            )
+            workout_id = cursor.lastrowid
+            summaries.workout_changed(cursor, None, _read_workout(cursor, workout_id))
+        responses.invalidate(data["User_ID"])
         return jsonify({"message": "Workout created successfully", "workout_id": workout_id}), 201
     
     return jsonify({"error": error}), 400
@@ -55,9 +70,7 @@ def update_workout(workout_id):
     data = request.get_json()
     error = None
     
-    db = get_db()
-    db.execute("SELECT * FROM Workouts WHERE Workout_ID = %s", (workout_id,))
-    workout = db.fetchone()
+    workout = db_connection.fetch_one("SELECT * FROM Workouts WHERE Workout_ID = %s", (workout_id,))
     
     if workout is None:
         error = "Workout not found"
@@ -79,12 +92,13 @@ def update_workout(workout_id):
     
     if error is None:
         params.append(workout_id)
-        db.execute(f"UPDATE Workouts SET {', '.join(update_fields)} WHERE Workout_ID = %s", tuple(params))
-        db_connection.get_db().commit()
-        db.close()
+        with db_connection.transaction() as cursor:
+            before = _read_workout(cursor, workout_id, lock=True)
+            cursor.execute(f"UPDATE Workouts SET {', '.join(update_fields)} WHERE Workout_ID = %s", tuple(params))
+            summaries.workout_changed(cursor, before, _read_workout(cursor, workout_id))
+        responses.invalidate(workout["User_ID"])
         return jsonify({"message": "Workout updated successfully"}), 200
     
-    db.close()
     if error == "Workout not found":
         return jsonify({"error": error}), 404
     return jsonify({"error": error}), 400
@@ -92,49 +106,78 @@ def update_workout(workout_id):
 
 @workouts.route("/<int:workout_id>", methods=["DELETE"])
 def delete_workout(workout_id):
-    db = get_db()
-    db.execute("SELECT * FROM Workouts WHERE Workout_ID = %s", (workout_id,))
-    workout = db.fetchone()
+    workout = db_connection.fetch_one("SELECT * FROM Workouts WHERE Workout_ID = %s", (workout_id,))
     
     error = None
     if workout is None:
         error = "Workout not found"
     
     if error is None:
-        db.execute("DELETE FROM Workouts WHERE Workout_ID = %s", (workout_id,))
-        db_connection.get_db().commit()
-        db.close()
+        with db_connection.transaction() as cursor:
+            before = _read_workout(cursor, workout_id, lock=True)
+            cursor.execute("DELETE FROM Workouts WHERE Workout_ID = %s", (workout_id,))
+            summaries.workout_changed(cursor, before, None)
+        responses.invalidate(workout["User_ID"])
         return jsonify({"message": "Workout deleted successfully"}), 200
     
-    db.close()
     return jsonify({"error": error}), 404
 
 
 @workouts.route("/metrics/weight", methods=["GET"])
 def get_weight_metrics():
+    """
+    Body metric history from MetricLogs, oldest first. With ?points=N (which
+    needs ?user_id=) the series is downsampled with LTTB on ?metric=
+    (weight_kg by default, or body_fat_pct) to at most N points, and the
+    result is cached.
+    """
     user_id = request.args.get("user_id")
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
+    points = request.args.get("points")
+    metric = request.args.get("metric", "weight_kg")
+    error = None
     
-    query = "SELECT * FROM Weight_Metrics WHERE 1=1"
+    query = "SELECT metriclog_id, user_id, date_time, weight_kg, body_fat_pct FROM MetricLogs WHERE 1=1"
     params = []
     
     if user_id:
-        query += " AND User_ID = %s"
+        query += " AND user_id = %s"
         params.append(user_id)
     if start_date:
-        query += " AND Weight_Date >= %s"
+        query += " AND date_time >= %s"
         params.append(start_date)
     if end_date:
-        query += " AND Weight_Date <= %s"
+        query += " AND date_time < DATE_ADD(%s, INTERVAL 1 DAY)"
         params.append(end_date)
     
-    query += " ORDER BY Weight_Date ASC"
-    
-    db = get_db()
-    db.execute(query, params)
-    weight_data = db.fetchall()
-    db.close()
+    query += " ORDER BY date_time ASC"
+    
+    if points is None:
+        weight_data = db_connection.stream_query(query, tuple(params))
+    else:
+        # a downsampled series only means something for one user
+        if not user_id:
+            error = "user_id is required with points"
+        elif metric not in SERIES_METRICS:
+            error = f"metric must be one of {', '.join(SERIES_METRICS)}"
+        else:
+            try:
+                points = int(points)
+            except ValueError:
+                error = "points must be an integer"
+        if error is None and points < 3:
+            error = "points must be at least 3"
+        if error is not None:
+            return jsonify({"error": error}), 400
+        
+        weight_data = SERIES_CACHE.get_or_set(
+            (user_id, start_date, end_date, metric, points),
+            lambda: downsample_rows(
+                db_connection.execute_query(query, tuple(params)), "date_time", metric, points
+            )
+        )
     
-    return jsonify(weight_data), 200
-
+    if wants_columnar():
+        return columnar_response(weight_data)
+    return stream_rows(weight_data)
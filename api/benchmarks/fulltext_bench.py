@@ -0,0 +1,166 @@
+"""
+FULLTEXT search against LIKE '%...%' on a synthetic notes table.
+
+Loads ROWS (default 1,000,000) generated meal notes into a scratch
+table, FulltextBench, spread over 1,000 clients, with a FULLTEXT index
+like the ones migration 0005 adds. Then it times finding every note
+that contains each search term, two ways:
+
+before: WHERE notes LIKE '%term%' (a scan of every row)
+after:  WHERE MATCH(notes) AGAINST ('"term"' IN BOOLEAN MODE)
+
+Both count all the matches: ranking by relevance needs every match,
+and a LIKE page that stops at the first 50 hits is only fast for
+common terms. It also times both with the search narrowed to one
+client.
+
+Before timing, it applies any pending migrations and checks that the
+FULLTEXT indexes from migration 0005 exist on Meals, Meal_Comments and
+Comments and that MySQL picks them for a notes search, so one run
+covers both the migration and the benchmark. Needs the database from
+docker compose. Run from the api/ folder:
+
+    python -m benchmarks.fulltext_bench [--rows N] [--keep]
+
+The table is dropped at the end unless --keep is given. Reruns with
+--keep skip the load.
+"""
+import argparse
+import random
+import timeit
+
+from backend import migrations
+from backend.db_connection import db as db_connection
+
+ROWS = 1_000_000
+CLIENTS = 1000
+BATCH = 5000
+REPEAT = 3
+TERMS = ["bloating", "late night", "cravings", "skipped breakfast"]
+
+WORDS = (
+    "ate with family felt full tired after gym quick lunch at desk protein shake "
+    "salad dressing extra portion rice pasta chicken vegetables water coffee tea "
+    "sugar snack fruit yogurt oats eggs toast sandwich soup dinner restaurant "
+    "takeout homemade weekend travel hungry energy good slept poorly stressed"
+).split()
+PHRASES = ["bloating after dinner", "late night snack", "sugar cravings", "skipped breakfast"]
+
+# the indexes migration 0005 adds, and a column each one covers
+LIVE_INDEXES = [
+    ("Meals", "ft_meals_notes", "Notes"),
+    ("Meal_Comments", "ft_meal_comments_text", "Comment_Text"),
+    ("Comments", "ft_comments_text", "comment_text"),
+]
+
+
+def make_note(rng):
+    words = rng.choices(WORDS, k=rng.randint(6, 20))
+    # about 1 in 50 notes mentions one of the searched phrases
+    if rng.random() < 0.02:
+        words.insert(rng.randrange(len(words)), rng.choice(PHRASES))
+    return " ".join(words)
+
+
+def load(conn, rows):
+    rng = random.Random(20)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_NAME FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'FulltextBench'"
+        )
+        existing = cursor.fetchone()
+        if existing is not None:
+            cursor.execute("SELECT COUNT(*) AS n FROM FulltextBench")
+            if cursor.fetchone()["n"] == rows:
+                return
+        cursor.execute("DROP TABLE IF EXISTS FulltextBench")
+        cursor.execute(
+            "CREATE TABLE FulltextBench ("
+            "id INT AUTO_INCREMENT PRIMARY KEY, user_id INT NOT NULL, notes TEXT, "
+            "KEY idx_fulltextbench_user (user_id))"
+        )
+        # the FULLTEXT index is built once after the load, which is much
+        # faster than maintaining it row by row
+        for start in range(0, rows, BATCH):
+            cursor.executemany(
+                "INSERT INTO FulltextBench (user_id, notes) VALUES (%s, %s)",
+                [(rng.randint(1, CLIENTS), make_note(rng)) for _ in range(min(BATCH, rows - start))]
+            )
+            conn.commit()
+        cursor.execute("CREATE FULLTEXT INDEX ft_fulltextbench_notes ON FulltextBench (notes)")
+
+
+def check_live_indexes(conn):
+    """Print, for each 0005 index, whether it exists and what a MATCH uses."""
+    with conn.cursor() as cursor:
+        for table, index, column in LIVE_INDEXES:
+            cursor.execute(
+                "SELECT INDEX_TYPE FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+                (table, index)
+            )
+            found = cursor.fetchone()
+            cursor.execute(
+                f"EXPLAIN SELECT * FROM {table} WHERE MATCH({column}) AGAINST (%s IN NATURAL LANGUAGE MODE)",
+                ("bloating",)
+            )
+            plan = cursor.fetchone()
+            state = found["INDEX_TYPE"] if found else "MISSING"
+            print(f"{table + '.' + index:40} {state:9} type={plan['type']} key={plan['key']}")
+
+
+def best_of(conn, query, params):
+    best = float("inf")
+    with conn.cursor() as cursor:
+        for _ in range(REPEAT):
+            start = timeit.default_timer()
+            cursor.execute(query, params)
+            hits = cursor.fetchone()["hits"]
+            best = min(best, timeit.default_timer() - start)
+    return best, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fulltext_bench")
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--keep", action="store_true", help="keep the FulltextBench table")
+    args = parser.parse_args()
+
+    from backend.rest_entry import create_app
+
+    app = create_app()
+    with app.app_context():
+        for migration in migrations.migrate():
+            print(f"applied {migration.version:04d}_{migration.name}")
+    conn = db_connection.connect()
+    try:
+        check_live_indexes(conn)
+        load(conn, args.rows)
+        print(f"rows: {args.rows}")
+        for term in TERMS:
+            for client in ("", " AND user_id = 7"):
+                like_time, like_hits = best_of(
+                    conn,
+                    f"SELECT COUNT(*) AS hits FROM FulltextBench WHERE notes LIKE %s{client}",
+                    (f"%{term}%",)
+                )
+                match_time, match_hits = best_of(
+                    conn,
+                    "SELECT COUNT(*) AS hits FROM FulltextBench "
+                    f"WHERE MATCH(notes) AGAINST (%s IN BOOLEAN MODE){client}",
+                    (f'"{term}"',)
+                )
+                label = f"{term!r}{' client 7' if client else ''}"
+                print(f"{label:32} LIKE {like_time * 1000:8.1f} ms ({like_hits:5} hits)  "
+                      f"MATCH {match_time * 1000:8.1f} ms ({match_hits:5} hits)  "
+                      f"{like_time / match_time:6.1f}x")
+    finally:
+        if not args.keep:
+            with conn.cursor() as cursor:
+                cursor.execute("DROP TABLE IF EXISTS FulltextBench")
+        db_connection.release(conn)
+
+
+if __name__ == "__main__":
+    main()
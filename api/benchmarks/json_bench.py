@@ -0,0 +1,68 @@
+"""
+Throughput of building the /clients/<id>/meals response body for 10k rows.
+
+before: Flask's stdlib JSON provider, the old per-cell serialize_row()
+        pass, then jsonify() of the whole list
+after:  OrjsonProvider with rows passed through untouched and encoded
+        200 at a time by backend.streaming.json_array_chunks()
+
+Rows are generated in memory, so this measures encoding only, not MySQL.
+Run from the api/ folder:
+
+    python -m benchmarks.json_bench
+"""
+import copy
+import json
+import timeit
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from backend.json_provider import OrjsonProvider
+from backend.streaming import json_array_chunks
+from benchmarks.serializer_bench import ROWS, legacy_serialize_row, make_rows
+
+REPEAT = 5
+
+
+def before(app, rows):
+    with app.test_request_context():
+        response = jsonify([legacy_serialize_row(row) for row in rows])
+        return response.get_data()
+
+
+def after(app, rows):
+    with app.test_request_context():
+        return b"".join(json_array_chunks(rows))
+
+
+def best_of(fn, app, rows):
+    best = float("inf")
+    for _ in range(REPEAT):
+        fresh = copy.deepcopy(rows)
+        start = timeit.default_timer()
+        body = fn(app, fresh)
+        best = min(best, timeit.default_timer() - start)
+    return best, body
+
+
+def main():
+    rows = make_rows()
+
+    stdlib_app = Flask(__name__)
+    stdlib_app.json = DefaultJSONProvider(stdlib_app)
+    orjson_app = Flask(__name__)
+    orjson_app.json = OrjsonProvider(orjson_app)
+
+    before_time, before_body = best_of(before, stdlib_app, rows)
+    after_time, after_body = best_of(after, orjson_app, rows)
+    assert json.loads(before_body) == json.loads(after_body)
+
+    print(f"rows:   {ROWS}")
+    print(f"before: {before_time * 1000:7.1f} ms  {ROWS / before_time:>10,.0f} rows/s")
+    print(f"after:  {after_time * 1000:7.1f} ms  {ROWS / after_time:>10,.0f} rows/s")
+    print(f"speedup: {before_time / after_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
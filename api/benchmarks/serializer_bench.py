@@ -0,0 +1,150 @@
+"""
+Microbenchmark: per-row cost of a serializer compiled from
+cursor.description against the isinstance-chain serialize_row() the meals
+and clients blueprints used to carry. No database is needed; rows mimic
+what a DictCursor returns for SELECT * FROM Meals.
+
+The compiled serializer lived in the executor until the orjson JSON
+provider made a row pre-pass unnecessary; it is kept here for comparison.
+
+Run from the api/ folder:
+
+    python -m benchmarks.serializer_bench
+"""
+import decimal
+import timeit
+from datetime import date, datetime, time, timedelta
+
+from pymysql.constants import FIELD_TYPE
+
+ROWS = 10_000
+REPEAT = 5
+
+
+def legacy_serialize_row(row):
+    """The per-cell isinstance chain previously copied into each blueprint."""
+    if row is None:
+        return None
+    result = {}
+    for key, value in row.items():
+        if isinstance(value, (datetime, date)):
+            result[key] = value.isoformat() if value else None
+        elif isinstance(value, time):
+            result[key] = str(value) if value else None
+        elif isinstance(value, timedelta):
+            result[key] = str(value) if value else None
+        elif isinstance(value, decimal.Decimal):
+            result[key] = float(value) if value is not None else None
+        else:
+            result[key] = value
+    return result
+
+
+def _isoformat(value):
+    # PyMySQL hands back zero dates like '0000-00-00' as plain strings
+    return value if value.__class__ is str else value.isoformat()
+
+
+# MySQL column type -> converter. TIME columns arrive as timedelta and
+# DECIMAL columns as decimal.Decimal; everything else is JSON-ready.
+_CONVERTERS = {
+    FIELD_TYPE.DATE: _isoformat,
+    FIELD_TYPE.NEWDATE: _isoformat,
+    FIELD_TYPE.DATETIME: _isoformat,
+    FIELD_TYPE.TIMESTAMP: _isoformat,
+    FIELD_TYPE.TIME: str,
+    FIELD_TYPE.DECIMAL: float,
+    FIELD_TYPE.NEWDECIMAL: float,
+}
+
+
+def _unchanged(row):
+    return row
+
+
+def compile_row_serializer(description):
+    """
+    Build a function that converts one row of a result set with the given
+    cursor.description. Rows are converted in place and returned.
+    """
+    converters = tuple(
+        (index, _CONVERTERS[column[1]])
+        for index, column in enumerate(description or ())
+        if column[1] in _CONVERTERS
+    )
+    if not converters:
+        return _unchanged
+
+    # DictCursor keys follow description order but are renamed to
+    # "table.column" on duplicates, so bind names from the first row
+    bound = None
+
+    def serialize(row):
+        nonlocal bound
+        if row is None:
+            return None
+        if bound is None:
+            names = tuple(row)
+            bound = tuple((names[index], convert) for index, convert in converters)
+        for key, convert in bound:
+            value = row[key]
+            if value is not None:
+                row[key] = convert(value)
+        return row
+
+    return serialize
+
+
+# cursor.description for the Meals table: (name, type_code, ...)
+DESCRIPTION = (
+    ("Meal_ID", FIELD_TYPE.LONG, None, None, None, None, False),
+    ("User_ID", FIELD_TYPE.LONG, None, None, None, None, False),
+    ("Meal_Name", FIELD_TYPE.VAR_STRING, None, None, None, None, False),
+    ("Calories", FIELD_TYPE.LONG, None, None, None, None, False),
+    ("Meal_Date", FIELD_TYPE.DATE, None, None, None, None, True),
+    ("Meal_Time", FIELD_TYPE.TIME, None, None, None, None, True),
+    ("Notes", FIELD_TYPE.BLOB, None, None, None, None, True),
+)
+
+
+def make_rows():
+    return [
+        {
+            "Meal_ID": i,
+            "User_ID": 121 + i % 40,
+            "Meal_Name": ("Oatmeal", "Chicken salad", "Pasta", "Protein shake")[i % 4],
+            "Calories": 200 + i % 900,
+            "Meal_Date": date(2024, 1, 1) + timedelta(days=i % 365),
+            "Meal_Time": timedelta(hours=7 + i % 14, minutes=i % 60),
+            "Notes": None if i % 3 else "felt full",
+        }
+        for i in range(ROWS)
+    ]
+
+
+def bench_legacy():
+    rows = make_rows()
+    start = timeit.default_timer()
+    [legacy_serialize_row(row) for row in rows]
+    return timeit.default_timer() - start
+
+
+def bench_compiled():
+    rows = make_rows()
+    start = timeit.default_timer()
+    convert = compile_row_serializer(DESCRIPTION)
+    [convert(row) for row in rows]
+    return timeit.default_timer() - start
+
+
+def main():
+    legacy = min(bench_legacy() for _ in range(REPEAT))
+    compiled = min(bench_compiled() for _ in range(REPEAT))
+    print(f"rows per run:         {ROWS}")
+    print(f"legacy serialize_row: {legacy / ROWS * 1e6:.2f} us/row")
+    print(f"compiled serializer:  {compiled / ROWS * 1e6:.2f} us/row")
+    print(f"speedup:              {legacy / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# Helpers for reading the API's ?format=columnar responses
+
+import pandas as pd
+
+
+def columnar_to_dataframe(payload):
+    """Build a DataFrame from a {"columns", "data"} columnar payload."""
+    data = {}
+    for name in payload.get("columns", []):
+        column = payload["data"][name]
+        if isinstance(column, dict):
+            # dictionary encoded text column: rebuild it as a pandas Categorical
+            column = pd.Categorical.from_codes(
+                [-1 if index is None else index for index in column["indices"]],
+                categories=column["dictionary"],
+            )
+        data[name] = column
+    return pd.DataFrame(data, columns=payload.get("columns", []))
@@ -4,7 +4,6 @@ logger = logging.getLogger(__name__)
 import streamlit as st
 import requests
 from modules.nav import SideBarLinks
-from datetime import date
 
 st.set_page_config(layout='wide')
 
@@ -20,35 +19,18 @@ st.write('')
 st.write("### Your Fitness & Nutrition Overview")
 
 # Stats at the top
+# One call returns goals, today's meals and workouts, and running totals
+dashboard = {}
+goals_count = 0
 try:
-    # Get goals
-    goals_response = requests.get(f"{API_BASE}/clients/goals", params={"user_id": user_id})
-    goals_count = 0
-    if goals_response.status_code == 200:
-        goals_data = goals_response.json()
-        goals_count = len(goals_data) if isinstance(goals_data, list) else 0
+    dashboard_response = requests.get(f"{API_BASE}/clients/{user_id}/dashboard", timeout=5)
+    if dashboard_response.status_code == 200:
+        dashboard = dashboard_response.json()
     
-    # Get workouts
-    workouts_response = requests.get(f"{API_BASE}/clients/{user_id}/workouts")
-    workouts_count = 0
-    if workouts_response.status_code == 200:
-        workouts_data = workouts_response.json()
-        workouts_count = len(workouts_data) if isinstance(workouts_data, list) else 0
-    
-    # Get meals
-    meals_response = requests.get(f"{API_BASE}/clients/{user_id}/meals")
-    meals_count = 0
-    today_calories = 0
-    today_date_str = date.today().strftime('%Y-%m-%d')
-    if meals_response.status_code == 200:
-        meals_data = meals_response.json()
-        meals_count = len(meals_data) if isinstance(meals_data, list) else 0
-        # Calculate only today's calories
-        today_calories = sum(
-            meal.get('Calories', 0) 
-            for meal in meals_data 
-            if meal.get('Meal_Date') == today_date_str
-        )
+    goals_count = len(dashboard.get('goals', []))
+    meals_count = dashboard.get('all_time', {}).get('meal_count', 0)
+    workouts_count = dashboard.get('all_time', {}).get('workout_count', 0)
+    today_calories = sum(meal.get('Calories') or 0 for meal in dashboard.get('meals', []))
     
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -98,21 +80,22 @@ col1, col2 = st.columns(2)
 with col1:
     st.write("**Recent Activity:**")
     try:
-        # Show today's meals
-        if meals_response.status_code == 200:
-            today_meals = [m for m in meals_data if m.get('Meal_Date') == today_date_str]
-            if today_meals:
-                st.write(f"✓ Logged {len(today_meals)} meal(s) today")
+        if dashboard:
+            # Show today's meals
+            if dashboard['meals']:
+                st.write(f"✓ Logged {len(dashboard['meals'])} meal(s) today")
             else:
                 st.info("No meals logged today")
-        
-        # Show today's workouts  
-        if workouts_response.status_code == 200:
-            today_workouts = [w for w in workouts_data if w.get('Workout_Date') == today_date_str]
-            if today_workouts:
-                st.write(f"✓ Completed {len(today_workouts)} workout(s) today")
+            
+            # Show today's workouts
+            if dashboard['workouts']:
+                st.write(f"✓ Completed {len(dashboard['workouts'])} workout(s) today")
             else:
                 st.info("No workouts logged today")
+            
+            week = dashboard['week']
+            st.write(f"Last 7 days: {week['meal_count']} meals, {week['workout_count']} workouts, "
+                     f"{week['calories_in']:,} calories in, {week['calories_burned']:,} burned")
     except:
         st.info("Activity summary will appear here")
 
@@ -21,14 +21,36 @@ if st.session_state.get('meal_logged', False):
     st.success(f"✅ **Meal '{last_meal_name}' logged successfully!** (ID: {last_meal_id})")
     st.balloons()
 
+# Look up a food to fill in the name and calories
+food_query = st.text_input("Search foods", placeholder="e.g., chicken breast")
+picked_food = None
+if food_query.strip():
+    try:
+        response = requests.get(f"{API_BASE}/foods/search", params={"q": food_query}, timeout=5)
+        matches = response.json() if response.status_code == 200 else []
+    except requests.exceptions.RequestException:
+        matches = []
+        st.warning("Food search is unavailable right now.")
+    if matches:
+        picked_food = st.selectbox(
+            "Matching foods",
+            matches,
+            format_func=lambda food: f"{food['name']} ({food['kcal_per_unit']:.0f} kcal per {food['unit']})"
+        )
+    else:
+        st.caption("No matching foods.")
+
 with st.form("log_meal_form"):
     st.subheader("Meal Information")
     
     # Clear form values if meal was just logged
     default_name = "" if st.session_state.get('meal_logged', False) else None
     default_calories = 0 if st.session_state.get('meal_logged', False) else 0
+    if picked_food is not None:
+        default_name = picked_food['name']
+        default_calories = int(round(picked_food['kcal_per_unit']))
     
-    meal_name = st.text_input("Meal Name *", placeholder="e.g., Grilled Chicken Salad", value=default_name if default_name == "" else None)
+    meal_name = st.text_input("Meal Name *", placeholder="e.g., Grilled Chicken Salad", value=default_name)
     calories = st.number_input("Calories *", min_value=0, step=1, value=default_calories)
     meal_date = st.date_input("Date *", value=date.today())
     meal_time = st.time_input("Time *", value=datetime.now().time())
@@ -4,6 +4,7 @@ import requests
 import pandas as pd
 from datetime import datetime, timedelta
 from modules.nav import SideBarLinks
+from modules.columnar import columnar_to_dataframe
 
 logger = logging.getLogger(__name__)
 st.set_page_config(layout='wide')
@@ -161,13 +162,15 @@ else:
         st.write("### Nutrition History")
         
         try:
-            meals_response = requests.get(f"{API_BASE}/clients/{selected_client_id}/meals")
+            meals_response = requests.get(
+                f"{API_BASE}/clients/{selected_client_id}/meals",
+                params={"format": "columnar"}
+            )
             
             if meals_response.status_code == 200:
-                meals = meals_response.json()
+                df_meals = columnar_to_dataframe(meals_response.json())
                 
-                if meals and len(meals) > 0:
-                    df_meals = pd.DataFrame(meals)
+                if not df_meals.empty:
                     
                     if 'Meal_Date' in df_meals.columns and 'Calories' in df_meals.columns:
                         daily_calories = df_meals.groupby('Meal_Date')['Calories'].sum().reset_index()
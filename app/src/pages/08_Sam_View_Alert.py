@@ -17,12 +17,6 @@ st.write("Stay informed about clients who may need extra attention")
 
 coach_id = st.session_state.get('user_id', 2)
 
-mock_clients = [
-    {"user_id": 1, "first_name": "Mark", "last_name": "Johnson"},
-    {"user_id": 3, "first_name": "Sarah", "last_name": "Williams"},
-    {"user_id": 4, "first_name": "John", "last_name": "Smith"},
-]
-
 tab1, tab2, tab3 = st.tabs(["Missed Workouts", "Nutrition Alerts", "Recent Activity"])
 
 with tab1:
@@ -39,27 +33,23 @@ with tab1:
             
             if notifications and len(notifications) > 0:
                 for notif in notifications:
-                    client_id = notif.get('User_ID')
-                    client_name = "Unknown Client"
-                    for client in mock_clients:
-                        if client['user_id'] == client_id:
-                            client_name = f"{client['first_name']} {client['last_name']}"
-                            break
+                    client_id = notif.get('user_id')
+                    client_name = f"{notif.get('fname', '')} {notif.get('lname', '')}".strip() or "Unknown Client"
                     
                     with st.container():
                         col1, col2, col3 = st.columns([2, 1, 1])
                         
                         with col1:
                             st.write(f"### {client_name}")
-                            st.write(f"**Notification:** {notif.get('Notification_Type', 'Alert')}")
-                            st.write(f"**Date:** {notif.get('Notification_Date', 'N/A')}")
-                            if notif.get('Message'):
-                                st.caption(notif.get('Message'))
+                            st.write(f"**Missed on:** {notif.get('about_date') or 'N/A'}")
+                            st.write(f"**Sent:** {notif.get('sent_date', 'N/A')}")
+                            if notif.get('body_text'):
+                                st.caption(notif.get('body_text'))
                         
                         with col2:
                             if st.button(
                                 "View Profile",
-                                key=f"view_missed_{notif.get('Notification_ID')}",
+                                key=f"view_missed_{notif.get('notif_id')}",
                                 use_container_width=True
                             ):
                                 st.session_state['selected_client_id'] = client_id
@@ -68,7 +58,7 @@ with tab1:
                         with col3:
                             if st.button(
                                 "Follow Up",
-                                key=f"msg_missed_{notif.get('Notification_ID')}",
+                                key=f"msg_missed_{notif.get('notif_id')}",
                                 type="primary",
                                 use_container_width=True
                             ):
@@ -91,25 +81,19 @@ with tab2:
     try:
         nutrition_alerts = []
         
-        for client in mock_clients:
-            try:
-                meals_response = requests.get(f"{API_BASE}/clients/{client['user_id']}/meals")
-                
-                if meals_response.status_code == 200:
-                    meals = meals_response.json()
-                    
-                    if not meals or len(meals) == 0:
-                        nutrition_alerts.append({
-                            "user_id": client['user_id'],
-                            "client_name": f"{client['first_name']} {client['last_name']}",
-                            "alert_type": "no_logs",
-                            "days_without_logs": "3+"
-                        })
-                    else:
-                        if meals:
-                            last_meal_date = meals[0].get('Meal_Date')
-            except:
-                pass
+        # the API checks every client on the roster and returns only those who need follow-up
+        alerts_response = requests.get(
+            f"{API_BASE}/coaches/{coach_id}/alerts/nutrition",
+            params={"min_days": 3, "limit": 50}
+        )
+        if alerts_response.status_code == 200:
+            for alert in alerts_response.json():
+                nutrition_alerts.append({
+                    "user_id": alert['user_id'],
+                    "client_name": f"{alert['fname']} {alert['lname']}",
+                    "alert_type": alert['alert'],
+                    "days_without_logs": alert['days_since_last_log']
+                })
         
         if nutrition_alerts:
             for alert in nutrition_alerts:
@@ -118,7 +102,10 @@ with tab2:
                     
                     with col1:
                         st.write(f"### {alert['client_name']}")
-                        st.warning(f"No meal logs for {alert.get('days_without_logs', '3+')} days")
+                        if alert['alert_type'] == 'no_logs':
+                            st.warning("No meal logs yet")
+                        else:
+                            st.warning(f"No meal logs for {alert['days_without_logs']} days")
                     
                     with col2:
                         if st.button(
@@ -160,48 +147,30 @@ with tab3:
     try:
         all_activities = []
         
-        for client in mock_clients:
-            client_name = f"{client['first_name']} {client['last_name']}"
-            
-            if "Workouts" in activity_filter:
-                try:
-                    workouts_response = requests.get(f"{API_BASE}/clients/{client['user_id']}/workouts")
-                    if workouts_response.status_code == 200:
-                        workouts = workouts_response.json()
-                        for workout in workouts[:5]:
-                            all_activities.append({
-                                "client_name": client_name,
-                                "user_id": client['user_id'],
-                                "activity_type": "workout",
-                                "date": workout.get('Workout_Date', 'N/A'),
-                                "workout_type": workout.get('Workout_Type', 'General'),
-                                "duration_minutes": workout.get('Duration_Minutes', 0),
-                                "details": f"{workout.get('Workout_Type', 'Workout')} - {workout.get('Duration_Minutes', 0)} min"
-                            })
-                except:
-                    pass
-            
-            if "Meals" in activity_filter:
-                try:
-                    meals_response = requests.get(f"{API_BASE}/clients/{client['user_id']}/meals")
-                    if meals_response.status_code == 200:
-                        meals = meals_response.json()
-                        for meal in meals[:5]:
-                            all_activities.append({
-                                "client_name": client_name,
-                                "user_id": client['user_id'],
-                                "activity_type": "meal",
-                                "date": meal.get('Meal_Date', 'N/A'),
-                                "meal_name": meal.get('Meal_Name', 'Meal'),
-                                "calories": meal.get('Calories', 0),
-                                "details": f"{meal.get('Meal_Name', 'Meal')} - {meal.get('Calories', 0)} cal"
-                            })
-                except:
-                    pass
+        # one call returns the latest five workouts and meals of every client
+        activity_response = requests.get(
+            f"{API_BASE}/coaches/{coach_id}/activity",
+            params={"per_client": 5, "days": days_back}
+        )
+        if activity_response.status_code == 200:
+            for item in activity_response.json():
+                if item['activity_type'] == 'workout' and "Workouts" not in activity_filter:
+                    continue
+                if item['activity_type'] == 'meal' and "Meals" not in activity_filter:
+                    continue
+                if item['activity_type'] == 'workout':
+                    details = f"{item.get('name') or 'Workout'} - {item.get('duration_minutes') or 0} min"
+                else:
+                    details = f"{item.get('name') or 'Meal'} - {item.get('calories') or 0} cal"
+                all_activities.append({
+                    "client_name": f"{item['fname']} {item['lname']}",
+                    "user_id": item['user_id'],
+                    "activity_type": item['activity_type'],
+                    "date": item.get('activity_date', 'N/A'),
+                    "details": details
+                })
         
         if all_activities:
-            all_activities.sort(key=lambda x: x.get('date', ''), reverse=True)
-            
             st.write("#### Summary")
             col1, col2, col3, col4 = st.columns(4)
             
@@ -39,7 +39,7 @@ st.write('')
 st.divider()
 
 # Tabs for different functions
-tab1, tab2, tab3 = st.tabs(["View & Comment on Meals", "Correct Meal Entries", "Meal History"])
+tab1, tab2, tab3, tab4 = st.tabs(["View & Comment on Meals", "Correct Meal Entries", "Meal History", "Search Notes"])
 
 # View & Comment on Meals
 with tab1:
@@ -275,6 +275,43 @@ with tab3:
         except Exception as e:
             st.error(f"Error: {str(e)}")
 
+# Search Notes
+with tab4:
+    st.subheader("Search Meal Notes & Comments")
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        search_text = st.text_input("Search for:", placeholder='e.g., bloating or "late night"')
+    with col2:
+        search_client_id = st.number_input("Client ID (0 = all):", min_value=0, value=0, step=1)
+    
+    if st.button("Search", type='primary') and search_text.strip():
+        params = {"q": search_text, "limit": 50}
+        if '"' in search_text:
+            params["mode"] = "boolean"
+        if search_client_id:
+            params["client_id"] = search_client_id
+        try:
+            response = requests.get(f"{API_BASE}/dieticians/search/notes", params=params)
+            
+            if response.status_code == 200:
+                hits = response.json()
+                if hits:
+                    labels = {"meal_note": "Meal note", "meal_comment": "Meal comment", "comment": "Dietitian comment"}
+                    for hit in hits:
+                        with st.container(border=True):
+                            st.write(f"**{labels.get(hit['Source'], hit['Source'])}** · Client {hit['Client_ID']} · Meal {hit['Meal_ID']} · {hit.get('Entry_Date') or 'N/A'}")
+                            st.write(hit['Text'])
+                    if response.headers.get('X-Next-Cursor'):
+                        st.caption("Showing the 50 most relevant matches.")
+                else:
+                    st.info("No notes or comments match that search")
+            else:
+                st.warning(response.json().get('error', 'Unable to search notes'))
+        
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+
 st.write('')
 if st.button("← Back to Dietitian Home", use_container_width=True):
     st.switch_page('pages/09_James_Home.py')
@@ -5,7 +5,6 @@ import streamlit as st
 from modules.nav import SideBarLinks
 import requests
 from datetime import datetime, date, timedelta
-from collections import defaultdict, Counter
 
 st.set_page_config(layout="wide")
 SideBarLinks()
@@ -53,34 +52,30 @@ with tab1:
     st.subheader("Calorie Intake Trends")
     
     try:
-        # Get meals data
+        # Per-day totals are grouped by the API, so only one row per day comes back
         if analysis_scope == "Specific Client":
-            response = requests.get(f"{API_BASE}/clients/{client_id}/meals")
+            response = requests.get(
+                f"{API_BASE}/clients/{client_id}/nutrition/daily",
+                params={"start_date": start_date.isoformat()}
+            )
         else:
-            response = requests.get(f"{API_BASE}/meals")
+            response = requests.get(
+                f"{API_BASE}/analytics/nutrition/daily",
+                params={"start_date": start_date.isoformat()}
+            )
         
         if response.status_code == 200:
-            meals = response.json()
+            daily = response.json()
             
-            # Filter by date
-            if meals and isinstance(meals, list):
-                meals = [m for m in meals if datetime.strptime(m.get('Meal_Date', '2000-01-01'), '%Y-%m-%d').date() >= start_date]
-            
-            if meals and len(meals) > 0:
-                # Group by date
-                calories_by_date = defaultdict(int)
-                meals_by_date = defaultdict(int)
-                
-                for meal in meals:
-                    meal_date = meal.get('Meal_Date', 'Unknown')
-                    calories_by_date[meal_date] += meal.get('Calories', 0)
-                    meals_by_date[meal_date] += 1
+            if daily and len(daily) > 0:
+                calories_by_date = {d['Meal_Date']: d['Total_Calories'] for d in daily}
+                meals_by_date = {d['Meal_Date']: d['Meal_Count'] for d in daily}
                 
                 # Display metrics
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    total_meals = len(meals)
+                    total_meals = sum(meals_by_date.values())
                     st.metric("Total Meals", total_meals)
                 
                 with col2:
@@ -182,54 +177,36 @@ with tab2:
     st.subheader("Meal Pattern Analysis")
     
     try:
-        # Get meals data
+        # Hour histogram, calorie bands and top meals are counted by the API
+        params = {"start_date": start_date.isoformat()}
         if analysis_scope == "Specific Client":
-            response = requests.get(f"{API_BASE}/clients/{client_id}/meals")
-        else:
-            response = requests.get(f"{API_BASE}/meals")
+            params["client_id"] = client_id
+        response = requests.get(f"{API_BASE}/analytics/meals/patterns", params=params)
         
         if response.status_code == 200:
-            meals = response.json()
+            patterns = response.json()
             
-            # Filter by date
-            if meals and isinstance(meals, list):
-                meals = [m for m in meals if datetime.strptime(m.get('Meal_Date', '2000-01-01'), '%Y-%m-%d').date() >= start_date]
-            
-            if meals and len(meals) > 0:
-                # Analyze meal names/types
-                meal_names = [m.get('Meal_Name', 'Unknown') for m in meals]
-                meal_counter = Counter(meal_names)
-                
+            if patterns.get("total_meals", 0) > 0:
                 st.write("### Most Common Meals")
                 
-                for meal_name, count in meal_counter.most_common(10):
+                for meal in patterns["top_meals"]:
                     col1, col2 = st.columns([3, 1])
                     with col1:
-                        st.write(f"**{meal_name}**")
+                        st.write(f"**{meal['Meal_Name']}**")
                     with col2:
-                        st.write(f"{count} times")
+                        st.write(f"{meal['Times']} times")
                 
                 st.write('')
                 st.write("### Meal Time Distribution")
                 
-                # Analyze meal times
-                meal_hours = []
-                for meal in meals:
-                    meal_time = meal.get('Meal_Time', '12:00:00')
-                    try:
-                        hour = int(meal_time.split(':')[0])
-                        meal_hours.append(hour)
-                    except:
-                        pass
+                hours = patterns["hours"]
                 
-                if meal_hours:
-                    hour_counter = Counter(meal_hours)
-                    
+                if sum(hours) > 0:
                     # Group into meal periods
-                    breakfast = sum(hour_counter.get(h, 0) for h in range(5, 11))
-                    lunch = sum(hour_counter.get(h, 0) for h in range(11, 15))
-                    dinner = sum(hour_counter.get(h, 0) for h in range(17, 22))
-                    snacks = len(meal_hours) - breakfast - lunch - dinner
+                    breakfast = sum(hours[5:11])
+                    lunch = sum(hours[11:15])
+                    dinner = sum(hours[17:22])
+                    snacks = sum(hours) - breakfast - lunch - dinner
                     
                     col1, col2, col3, col4 = st.columns(4)
                     
@@ -252,29 +229,24 @@ with tab2:
                 st.write('')
                 st.write("### Calorie Distribution by Meal Size")
                 
-                # Categorize by calorie range
-                very_low = sum(1 for m in meals if m.get('Calories', 0) < 200)
-                low = sum(1 for m in meals if 200 <= m.get('Calories', 0) < 400)
-                moderate = sum(1 for m in meals if 400 <= m.get('Calories', 0) < 700)
-                high = sum(1 for m in meals if 700 <= m.get('Calories', 0) < 1000)
-                very_high = sum(1 for m in meals if m.get('Calories', 0) >= 1000)
+                bands = {band["band"]: band["meals"] for band in patterns["calorie_bands"]}
                 
                 col1, col2, col3, col4, col5 = st.columns(5)
                 
                 with col1:
-                    st.metric("< 200 cal", very_low)
+                    st.metric("< 200 cal", bands["very_low"])
                     st.caption("Snacks")
                 with col2:
-                    st.metric("200-400", low)
+                    st.metric("200-400", bands["low"])
                     st.caption("Light meals")
                 with col3:
-                    st.metric("400-700", moderate)
+                    st.metric("400-700", bands["moderate"])
                     st.caption("Regular meals")
                 with col4:
-                    st.metric("700-1000", high)
+                    st.metric("700-1000", bands["high"])
                     st.caption("Large meals")
                 with col5:
-                    st.metric("> 1000 cal", very_high)
+                    st.metric("> 1000 cal", bands["very_high"])
                     st.caption("Very large")
             
             else:
@@ -291,91 +263,56 @@ with tab3:
     
     if analysis_scope == "All Clients":
         try:
-            response = requests.get(f"{API_BASE}/meals")
+            # Grouping, ranking and the top-10 cut happen in SQL
+            response = requests.get(
+                f"{API_BASE}/analytics/clients/compare",
+                params={"since": start_date.isoformat(), "limit": 10}
+            )
             
             if response.status_code == 200:
-                meals = response.json()
+                comparison = response.json()
+                client_stats = comparison.get("clients", [])
+                overall = comparison.get("overall", {})
                 
-                if meals and isinstance(meals, list):
-                    # Filter by date
-                    meals = [m for m in meals if datetime.strptime(m.get('Meal_Date', '2000-01-01'), '%Y-%m-%d').date() >= start_date]
+                if len(client_stats) > 0:
+                    st.write(f"### Client Overview ({overall['Clients_Tracked']} clients)")
                     
-                    if len(meals) > 0:
-                        # Group by client
-                        meals_by_client = defaultdict(list)
-                        for meal in meals:
-                            client = meal.get('User_ID', 'Unknown')
-                            meals_by_client[client].append(meal)
-                        
-                        st.write(f"### Client Overview ({len(meals_by_client)} clients)")
-                        
-                        # Create comparison table
-                        client_stats = []
-                        
-                        for client_id_key, client_meals in meals_by_client.items():
-                            total_cal = sum(m.get('Calories', 0) for m in client_meals)
-                            avg_cal = total_cal // len(client_meals) if len(client_meals) > 0 else 0
+                    # Display top clients
+                    for stats in client_stats:
+                        with st.expander(f"Client #{stats['Client_ID']} - {stats['Total_Meals']} meals logged"):
+                            col1, col2, col3, col4 = st.columns(4)
                             
-                            # Get unique dates
-                            dates = set(m.get('Meal_Date') for m in client_meals)
-                            days_active = len(dates)
+                            with col1:
+                                st.metric("Total Meals", stats['Total_Meals'])
+                            with col2:
+                                st.metric("Days Active", stats['Days_Active'])
+                            with col3:
+                                st.metric("Avg Cal/Day", f"{stats['Avg_Cal_Per_Day']:,}")
+                            with col4:
+                                st.metric("Avg Cal/Meal", stats['Avg_Cal_Per_Meal'])
                             
-                            avg_per_day = total_cal // days_active if days_active > 0 else 0
-                            
-                            client_stats.append({
-                                "Client ID": client_id_key,
-                                "Total Meals": len(client_meals),
-                                "Days Active": days_active,
-                                "Avg Cal/Day": avg_per_day,
-                                "Avg Cal/Meal": avg_cal
-                            })
-                        
-                        # Sort by total meals
-                        client_stats.sort(key=lambda x: x["Total Meals"], reverse=True)
-                        
-                        # Display top clients
-                        for stats in client_stats[:10]:  # Top 10 clients
-                            with st.expander(f"Client #{stats['Client ID']} - {stats['Total Meals']} meals logged"):
-                                col1, col2, col3, col4 = st.columns(4)
-                                
-                                with col1:
-                                    st.metric("Total Meals", stats['Total Meals'])
-                                with col2:
-                                    st.metric("Days Active", stats['Days Active'])
-                                with col3:
-                                    st.metric("Avg Cal/Day", f"{stats['Avg Cal/Day']:,}")
-                                with col4:
-                                    st.metric("Avg Cal/Meal", stats['Avg Cal/Meal'])
-                                
-                                # Recommendations
-                                if stats['Avg Cal/Day'] < 1500:
-                                    st.warning("⚠️ Low daily intake - may need nutritional guidance")
-                                elif stats['Avg Cal/Day'] > 3000:
-                                    st.warning("⚠️ High daily intake - consider portion control advice")
-                                else:
-                                    st.success("✅ Intake within healthy range")
-                        
-                        st.write('')
-                        st.write("### Overall Statistics")
-                        
-                        # Overall stats
-                        total_tracked_meals = len(meals)
-                        total_tracked_calories = sum(m.get('Calories', 0) for m in meals)
-                        overall_avg = total_tracked_calories // total_tracked_meals if total_tracked_meals > 0 else 0
-                        
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            st.metric("Total Clients Tracked", len(meals_by_client))
-                        with col2:
-                            st.metric("Total Meals Analyzed", total_tracked_meals)
-                        with col3:
-                            st.metric("Overall Avg Cal/Meal", overall_avg)
+                            # Recommendations
+                            if stats['Avg_Cal_Per_Day'] < 1500:
+                                st.warning("⚠️ Low daily intake - may need nutritional guidance")
+                            elif stats['Avg_Cal_Per_Day'] > 3000:
+                                st.warning("⚠️ High daily intake - consider portion control advice")
+                            else:
+                                st.success("✅ Intake within healthy range")
+                    
+                    st.write('')
+                    st.write("### Overall Statistics")
+                    
+                    col1, col2, col3 = st.columns(3)
                     
-                    else:
-                        st.info("No meal data available for the selected period")
+                    with col1:
+                        st.metric("Total Clients Tracked", overall['Clients_Tracked'])
+                    with col2:
+                        st.metric("Total Meals Analyzed", overall['Meals_Analyzed'])
+                    with col3:
+                        st.metric("Overall Avg Cal/Meal", overall['Avg_Cal_Per_Meal'])
+                
                 else:
-                    st.info("No meal data available")
+                    st.info("No meal data available for the selected period")
             else:
                 st.warning("Unable to load meal data")
         